@@ -15,3 +15,21 @@ keepalive = 2
 accesslog = "-"
 errorlog = "-"
 loglevel = "info"
+
+
+# Worker start-up
+# Resume queued jobs a previous worker left behind, and warm the cache. The
+# cache may be per-process (LocMemCache), so each worker warms its own copy.
+def post_worker_init(worker):
+    from django.conf import settings
+
+    from main.images import resume_jobs as resume_images
+    from main.translation import resume_jobs as resume_translations
+
+    resume_translations()
+    resume_images()
+
+    if settings.HOME_CACHE_WARMUP:
+        from main.caching import schedule_warmup
+
+        schedule_warmup(delay=0)
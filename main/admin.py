@@ -1,7 +1,11 @@
 from django.contrib import admin
 from django.contrib.auth.models import Group, User
+from django.db.models import Exists, OuterRef
 from parler.admin import TranslatableAdmin
 
+from .archive import archive_messages, moderate_testimonials
+from .caching import invalidate_model
+from .counters import get_count
 from .models import (
     ContactInfo,
     ContactMessage,
@@ -9,6 +13,7 @@ from .models import (
     Experience,
     HeroSlide,
     Hobby,
+    ImageJob,
     Profile,
     Project,
     Recognition,
@@ -16,7 +21,12 @@ from .models import (
     Skill,
     TechTag,
     Testimonial,
+    TranslationJob,
+    TranslationMemory,
 )
+from .pagination import EstimatedCountPaginator, KeysetChangeList
+from .search import full_text_filter
+from .translation import enqueue_translation, stale_sources
 
 admin.site.unregister(Group)
 admin.site.unregister(User)
@@ -31,13 +41,72 @@ class SingletonAdminMixin:
         return super().has_add_permission(request)
 
 
+class PrefetchTranslationsMixin:
+    """Loads the translations of a page of rows in one query.
+
+    Translated columns (and ``safe_translation_getter`` fallbacks) then read
+    the prefetched rows instead of querying, or hitting parler's cache, per row.
+    """
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related("translations")
+
+
+class FrenchStatusFilter(admin.SimpleListFilter):
+    title = "French translation"
+    parameter_name = "french"
+
+    def lookups(self, request, model_admin):
+        return (("stale", "Missing or outdated"), ("current", "Up to date"))
+
+    def queryset(self, request, queryset):
+        if self.value() == "stale":
+            return queryset.filter(french_stale=True)
+        if self.value() == "current":
+            return queryset.filter(french_stale=False)
+        return queryset
+
+
+class FrenchStatusMixin:
+    """Flags rows whose French is missing or older than their English text."""
+
+    def get_queryset(self, request):
+        stale = stale_sources().filter(
+            model_label=self.model._meta.label_lower, object_id=OuterRef("pk")
+        )
+        return super().get_queryset(request).annotate(french_stale=Exists(stale))
+
+    def get_list_display(self, request):
+        return (*super().get_list_display(request), "french_up_to_date")
+
+    def get_list_filter(self, request):
+        return (*super().get_list_filter(request), FrenchStatusFilter)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if self.has_change_permission(request):
+            actions["retranslate_french"] = self.get_action("retranslate_french")
+        return actions
+
+    @admin.display(boolean=True, description="French", ordering="french_stale")
+    def french_up_to_date(self, obj):
+        return not obj.french_stale
+
+    @admin.action(description="Re-translate outdated French")
+    def retranslate_french(self, request, queryset):
+        stale = queryset.filter(french_stale=True)
+        for obj in stale:
+            enqueue_translation(obj)
+        self.message_user(request, f"Queued {len(stale)} row(s) for translation.")
+
+
 class HeroSlideInline(admin.TabularInline):
     model = HeroSlide
     extra = 1
 
 
 @admin.register(Profile)
-class ProfileAdmin(SingletonAdminMixin, TranslatableAdmin):
+class ProfileAdmin(SingletonAdminMixin, FrenchStatusMixin, TranslatableAdmin):
     inlines = [HeroSlideInline]
     fieldsets = (
         (
@@ -69,7 +138,7 @@ class ContactInfoAdmin(SingletonAdminMixin, admin.ModelAdmin):
 
 
 @admin.register(SiteSettings)
-class SiteSettingsAdmin(SingletonAdminMixin, TranslatableAdmin):
+class SiteSettingsAdmin(SingletonAdminMixin, FrenchStatusMixin, TranslatableAdmin):
     list_display = ("__str__",)
     fieldsets = (
         (
@@ -84,7 +153,7 @@ class SiteSettingsAdmin(SingletonAdminMixin, TranslatableAdmin):
 
 
 @admin.register(Skill)
-class SkillAdmin(TranslatableAdmin):
+class SkillAdmin(PrefetchTranslationsMixin, FrenchStatusMixin, TranslatableAdmin):
     show_add_link = True
     list_display = ("name", "category", "order")
     # Edit category + order directly in the list — pick from the dropdown on
@@ -105,7 +174,7 @@ class TechTagAdmin(admin.ModelAdmin):
 
 
 @admin.register(Project)
-class ProjectAdmin(TranslatableAdmin):
+class ProjectAdmin(PrefetchTranslationsMixin, FrenchStatusMixin, TranslatableAdmin):
     show_add_link = True
     list_display = ("title", "created_date", "description_snippet", "link")
     search_fields = ("translations__title", "translations__description")
@@ -137,7 +206,7 @@ class ProjectAdmin(TranslatableAdmin):
 
 
 @admin.register(Experience)
-class ExperienceAdmin(TranslatableAdmin):
+class ExperienceAdmin(PrefetchTranslationsMixin, FrenchStatusMixin, TranslatableAdmin):
     show_add_link = True
     list_display = ("job_title", "company", "role_type", "start_date", "end_date", "is_current")
     search_fields = ("translations__job_title", "translations__company")
@@ -158,7 +227,7 @@ class ExperienceAdmin(TranslatableAdmin):
 
 
 @admin.register(Education)
-class EducationAdmin(TranslatableAdmin):
+class EducationAdmin(PrefetchTranslationsMixin, FrenchStatusMixin, TranslatableAdmin):
     show_add_link = True
     list_display = ("degree", "institution", "start_date", "end_date")
     search_fields = ("translations__degree", "translations__institution")
@@ -167,7 +236,7 @@ class EducationAdmin(TranslatableAdmin):
 
 
 @admin.register(Recognition)
-class RecognitionAdmin(TranslatableAdmin):
+class RecognitionAdmin(PrefetchTranslationsMixin, FrenchStatusMixin, TranslatableAdmin):
     show_add_link = True
     list_display = ("title", "date_text", "order")
     list_editable = ("order",)
@@ -177,7 +246,7 @@ class RecognitionAdmin(TranslatableAdmin):
 
 
 @admin.register(Hobby)
-class HobbyAdmin(TranslatableAdmin):
+class HobbyAdmin(PrefetchTranslationsMixin, FrenchStatusMixin, TranslatableAdmin):
     show_add_link = True
     list_display = ("name", "font_awesome_icon", "icon")
 
@@ -185,10 +254,38 @@ class HobbyAdmin(TranslatableAdmin):
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
     show_add_link = True
+    # Spam makes this the largest table: smaller pages, and no second COUNT of
+    # the unfiltered table just to print "N total" next to a search.
+    list_per_page = 50
+    show_full_result_count = False
     list_display = ("name", "email", "subject", "message_snippet", "created_at")
     readonly_fields = ("name", "email", "subject", "message", "created_at")
     search_fields = ("name", "email", "subject", "message")
     list_filter = ("created_at",)
+    actions = ["archive_selected"]
+    # Cursor paging, estimated counts and full-text search (main.pagination,
+    # main.search) keep the list fast at millions of messages.
+    paginator = EstimatedCountPaginator
+    change_list_template = "admin/keyset_change_list.html"
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def cached_result_count(self, request):
+        # The admin badge counter: unfiltered pages need no COUNT(*).
+        return get_count("messages")
+
+    def get_search_results(self, request, queryset, search_term):
+        found = full_text_filter(queryset, search_term)
+        if found is not None:
+            return found, False
+        return super().get_search_results(request, queryset, search_term)
+
+    @admin.action(description="Archive selected messages", permissions=["delete"])
+    def archive_selected(self, request, queryset):
+        archived, path = archive_messages(queryset)
+        if path:
+            self.message_user(request, f"Archived {archived} message(s) to {path.name}.")
 
     def message_snippet(self, obj):
         return obj.message[:50] + "..." if obj.message else ""
@@ -197,11 +294,13 @@ class ContactMessageAdmin(admin.ModelAdmin):
 
 
 @admin.register(Testimonial)
-class TestimonialAdmin(TranslatableAdmin):
+class TestimonialAdmin(PrefetchTranslationsMixin, FrenchStatusMixin, TranslatableAdmin):
     show_add_link = True
     list_display = ("name", "get_role_company", "quote_snippet", "is_approved", "created_at")
     list_filter = ("is_approved", "created_at")
     actions = ["approve_testimonials", "reject_testimonials"]
+    list_per_page = 50
+    show_full_result_count = False
     search_fields = ("name", "translations__quote", "translations__role_company")
 
     def get_role_company(self, obj):
@@ -218,8 +317,36 @@ class TestimonialAdmin(TranslatableAdmin):
 
     @admin.action(description="Approve selected testimonials")
     def approve_testimonials(self, request, queryset):
-        queryset.update(is_approved=True)
+        approved = moderate_testimonials(queryset, approve=True)
+        # queryset.update() sends no post_save — invalidate the home page by hand.
+        invalidate_model(Testimonial)
+        self.message_user(request, f"Approved {approved} testimonial(s).")
 
     @admin.action(description="Reject selected testimonials")
     def reject_testimonials(self, request, queryset):
-        queryset.update(is_approved=False)
+        rejected = moderate_testimonials(queryset, approve=False)
+        invalidate_model(Testimonial)
+        self.message_user(request, f"Rejected {rejected} testimonial(s).")
+
+
+@admin.register(TranslationJob)
+class TranslationJobAdmin(admin.ModelAdmin):
+    list_display = ("model_label", "object_id", "status", "attempts", "updated_at")
+    list_filter = ("status", "model_label")
+    readonly_fields = ("model_label", "object_id", "attempts", "last_error", "created_at")
+
+
+@admin.register(TranslationMemory)
+class TranslationMemoryAdmin(admin.ModelAdmin):
+    list_display = ("source_text", "translated_text", "hits", "last_used_at")
+    search_fields = ("source_text", "translated_text")
+    show_full_result_count = False
+    readonly_fields = ("source_hash", "source_language", "target_language", "source_text")
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "updated_at")
+    list_filter = ("status", "model_label")
+    search_fields = ("name", "content_hash")
+    readonly_fields = ("name", "model_label", "field", "content_hash", "attempts", "last_error")
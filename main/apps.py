@@ -6,4 +6,5 @@ class MainConfig(AppConfig):
 
     def ready(self):
         # Wire signal handlers (auto-translate + fragment cache invalidation)
-        from . import signals  # noqa: F401
+        # and register system checks.
+        from . import checks, signals  # noqa: F401
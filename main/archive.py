@@ -0,0 +1,122 @@
+"""Archival of old contact messages and chunked testimonial moderation.
+
+Contact messages are only ever read in the admin, and spam makes the table
+grow without bound. ``archive_messages`` moves rows into a gzipped JSON Lines
+file under ``ARCHIVE_ROOT`` (one object per line, oldest first) and deletes
+them in batches, each its own short transaction, so the hot table stays small
+without long locks. A batch is synced to disk before it is deleted: an
+interrupted run can at worst archive a batch twice, never lose one.
+
+Archived rows are removed with a plain SQL DELETE, not ``QuerySet.delete()``,
+which would load every row again to send it post_delete. No post_delete
+receiver runs for them: the admin message counter is adjusted once per batch
+instead, and any receiver added for ContactMessage must be mirrored here.
+
+Bulk approve/reject of testimonials is chunked the same way.
+"""
+
+import gzip
+import json
+import os
+from datetime import timedelta
+from itertools import chain
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .counters import adjust_count
+from .models import ContactMessage, Testimonial
+
+BATCH_SIZE = 1000
+
+ARCHIVE_FIELDS = ("id", "name", "email", "subject", "message", "created_at")
+
+
+def older_than(days):
+    """Contact messages received more than ``days`` days ago."""
+    return ContactMessage.objects.filter(created_at__lt=timezone.now() - timedelta(days=days))
+
+
+def _batches(queryset, batch_size):
+    """Successive lists of row dicts from ``queryset``, in primary-key order."""
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk).order_by("pk").values(*ARCHIVE_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1]["id"]
+
+
+def _delete_messages(pks):
+    """Delete the contact messages ``pks`` in one statement, sending no signals.
+
+    Nothing references contact messages, so there are no cascades to miss.
+    """
+    quote = connection.ops.quote_name
+    meta = ContactMessage._meta
+    placeholders = ", ".join(["%s"] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(meta.db_table)} WHERE {quote(meta.pk.column)} IN ({placeholders})",
+            pks,
+        )
+        return cursor.rowcount
+
+
+def archive_path():
+    stamp = timezone.now().strftime("%Y%m%d-%H%M%S-%f")
+    return Path(settings.ARCHIVE_ROOT) / f"contact-messages-{stamp}.jsonl.gz"
+
+
+def archive_messages(queryset, batch_size=BATCH_SIZE, path=None, progress=None):
+    """Append the messages in ``queryset`` to a gzipped JSONL file, then delete them.
+
+    Returns ``(archived count, path)``; no file is written when nothing
+    matches. ``progress``, if given, is called with the running count after
+    each batch.
+    """
+    batches = _batches(queryset, batch_size)
+    first = next(batches, None)
+    if first is None:
+        return 0, None
+    path = Path(path or archive_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    archived = 0
+    with path.open("ab") as raw, gzip.open(raw, "at", encoding="utf-8") as archive:
+        for rows in chain([first], batches):
+            for row in rows:
+                archive.write(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+            archive.flush()  # through the compressor into ``raw``
+            os.fsync(raw.fileno())
+            with transaction.atomic():
+                deleted = _delete_messages([row["id"] for row in rows])
+                adjust_count("messages", -deleted)
+            archived += len(rows)
+            if progress:
+                progress(archived)
+    return archived, path
+
+
+def moderate_testimonials(queryset, approve, batch_size=BATCH_SIZE):
+    """Approve (or reject) the testimonials in ``queryset`` in chunked transactions.
+
+    Only rows whose state changes are written; returns how many that was.
+    The caller retires the cached home page once all chunks are done.
+    """
+    pks = list(queryset.filter(is_approved=not approve).values_list("pk", flat=True))
+    changed = 0
+    for start in range(0, len(pks), batch_size):
+        with transaction.atomic():
+            updated = Testimonial.objects.filter(
+                pk__in=pks[start : start + batch_size], is_approved=not approve
+            ).update(is_approved=approve)
+            # queryset.update() sends no post_save — keep the admin badge current by hand.
+            adjust_count("pending_testimonials", -updated if approve else updated)
+        changed += updated
+    return changed
@@ -0,0 +1,158 @@
+"""A Django cache backend in a local SQLite file, shared by every worker on the host.
+
+Meant for django-ratelimit when there is no Redis: LocMemCache gives each
+gunicorn worker its own counters (so a client gets workers x the limit), and
+Django's DatabaseCache and FileBasedCache increment with a read followed by a
+write, which concurrent requests can interleave. Here ``add()`` and ``incr()``
+are each a single upsert/update statement, and SQLite serialises writers, so
+counts stay exact across processes. WAL mode lets reads proceed during writes.
+
+    CACHES["ratelimit"] = {
+        "BACKEND": "main.cache_backends.SQLiteCache",
+        "LOCATION": "/var/lib/portfolio/ratelimit.sqlite3",
+    }
+
+Integers are stored as SQLite integers so ``incr()`` can do the arithmetic
+in SQL; anything else is pickled. Expired rows are purged every
+``CULL_EVERY`` writes.
+"""
+
+import itertools
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+CULL_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL
+) WITHOUT ROWID
+"""
+
+
+def _encode(value):
+    # bool is an int subclass, but must come back as a bool.
+    if type(value) is int and -(2**63) <= value < 2**63:
+        return value
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(value):
+    return value if isinstance(value, int) else pickle.loads(value)
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = str(location)
+        self._local = threading.local()
+        self._writes = itertools.count(1)  # next() is atomic; shared by all threads
+
+    def _connection(self):
+        # One connection per thread, reopened after a fork (gunicorn --preload).
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(_SCHEMA)
+            local.connection, local.pid = connection, os.getpid()
+        return local.connection
+
+    def _wrote(self, connection):
+        if next(self._writes) % CULL_EVERY == 0:
+            connection.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return default if row is None else _decode(row[0])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, _encode(value), self.get_backend_timeout(timeout)),
+        )
+        self._wrote(connection)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """Store ``value`` unless a live entry exists; True if it was stored."""
+        key = self.make_and_validate_key(key, version=version)
+        connection = self._connection()
+        # An expired row counts as absent: the upsert overwrites only those.
+        cursor = connection.execute(
+            "INSERT INTO cache (key, value, expires) VALUES (?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires"
+            " WHERE cache.expires IS NOT NULL AND cache.expires <= ?",
+            (key, _encode(value), self.get_backend_timeout(timeout), time.time()),
+        )
+        self._wrote(connection)
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        connection = self._connection()
+        rows = connection.execute(
+            "UPDATE cache SET value = value + ? WHERE key = ?"
+            " AND typeof(value) = 'integer' AND (expires IS NULL OR expires > ?)"
+            " RETURNING value",
+            (delta, key, time.time()),
+        ).fetchall()  # step the statement to completion, which commits it
+        if not rows:
+            raise ValueError(f"Key '{key}' not found")
+        return rows[0][0]
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection().execute(
+            "UPDATE cache SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (self.get_backend_timeout(timeout), key, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+        return cursor.rowcount == 1
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = (
+            self._connection()
+            .execute(
+                "SELECT 1 FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return row is not None
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache")
+
+    def close(self, **kwargs):
+        """Close this thread's connection; Django calls this as each request ends."""
+        if self._path == ":memory:":
+            return  # closing would throw the whole database away
+        local = self._local
+        connection, pid = getattr(local, "connection", None), getattr(local, "pid", None)
+        local.connection = local.pid = None
+        # A connection inherited across a fork belongs to the parent: just drop it.
+        if connection is not None and pid == os.getpid():
+            connection.close()
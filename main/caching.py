@@ -0,0 +1,333 @@
+"""Whole-page response cache for the home view.
+
+Anonymous GETs are served from pre-rendered bytes keyed on language, absolute
+URL, date, and a global content version that main.signals bumps on every
+content change. The same version drives the page's ETag and Last-Modified
+headers.
+
+The page embeds two CSRF forms, and a token rendered for one visitor is useless
+to the next. Pages are therefore cached with a placeholder that is swapped for
+the requester's own token on the way out.
+
+Content changes also retire the {% cache %} fragments they render into. Those
+invalidations are collected and applied once per transaction (or once per
+``coalesce_invalidations()`` block), not once per saved row. With
+HOME_CACHE_WARMUP on, each flush is followed by a background re-render of the
+home page in every language, so visitors never hit a cold render.
+
+Both guarantees need a cache shared by every worker (Redis). Fragments are only
+deleted from the committing process's cache, so with the per-process
+LocMemCache another worker picks up the new content version (within
+CONTENT_STAMP_TIMEOUT) but keeps rendering its old fragments into the new
+pages until they expire. ``manage.py check --deploy`` warns about that setup.
+"""
+
+import datetime
+import hashlib
+import io
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.handlers.wsgi import WSGIHandler, WSGIRequest
+from django.db import connections, transaction
+from django.db.models import F
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import get_language, override
+
+from .models import (
+    ContentStamp,
+    Education,
+    Experience,
+    Hobby,
+    Project,
+    Recognition,
+    Skill,
+    TechTag,
+    Testimonial,
+)
+
+logger = logging.getLogger(__name__)
+
+CONTENT_STAMP_KEY = "home:content-stamp"
+# With a per-process cache (LocMemCache) a worker sees another worker's bump
+# once this expires; with Redis the delete in bump_content_version() is seen
+# everywhere immediately. It does not bound fragment staleness (see above).
+CONTENT_STAMP_TIMEOUT = 30
+PAGE_CACHE_TIMEOUT = 3600
+
+# Seconds a background warm-up waits after an invalidation, so a burst of admin
+# saves is re-rendered once.
+WARMUP_DELAY = 2.0
+
+# Rendered in place of {% csrf_token %}'s value — only [A-Z_] so escaping is a no-op.
+CSRF_TOKEN_PLACEHOLDER = "__CSRF_TOKEN_PLACEHOLDER__"
+
+
+def get_content_stamp():
+    """Return ``(version, updated_at)`` for the home page content."""
+    stamp = cache.get(CONTENT_STAMP_KEY)
+    if stamp is None:
+        row, _created = ContentStamp.objects.get_or_create(
+            pk=1, defaults={"updated_at": timezone.now()}
+        )
+        stamp = (row.version, row.updated_at)
+        cache.set(CONTENT_STAMP_KEY, stamp, CONTENT_STAMP_TIMEOUT)
+    return stamp
+
+
+def get_content_version():
+    version, updated_at = get_content_stamp()
+    # The timestamp keeps versions unique even if the row is recreated from 0.
+    return f"{version}.{int(updated_at.timestamp() * 1_000_000)}"
+
+
+def bump_content_version():
+    """Record a content change, retiring every cached page and ETag."""
+    now = timezone.now()
+    updated = ContentStamp.objects.filter(pk=1).update(version=F("version") + 1, updated_at=now)
+    if not updated:
+        ContentStamp.objects.get_or_create(pk=1, defaults={"version": 1, "updated_at": now})
+    cache.delete(CONTENT_STAMP_KEY)
+    # Readers in other connections may re-cache the old row before this commits.
+    transaction.on_commit(lambda: cache.delete(CONTENT_STAMP_KEY))
+
+
+class _PendingInvalidations(threading.local):
+    def __init__(self):
+        self.dirty = False
+        self.fragments = set()
+        self.held = 0
+
+
+_pending = _PendingInvalidations()
+
+
+def invalidate_content(fragments=()):
+    """Retire cached pages and the named {% cache %} fragments once committed.
+
+    Calls within one transaction or ``coalesce_invalidations()`` block collapse
+    into a single fragment delete and content version bump.
+    """
+    _pending.dirty = True
+    _pending.fragments.update(fragments)
+    if not _pending.held:
+        # Runs immediately outside a transaction; later callbacks find nothing left.
+        transaction.on_commit(_flush_invalidations)
+
+
+# The {% cache %} fragments each model renders into. Names must match the
+# unquoted {% cache N name LANGUAGE_CODE %} tags in home.html — a quoted name
+# becomes part of the key and never matches. Home content models not listed
+# here only appear outside the fragments and just retire cached pages.
+FRAGMENT_DEPENDENCIES = {
+    Skill: ("home.skills",),
+    Project: ("home.projects",),
+    Experience: ("home.career",),
+    Education: ("home.career",),
+    TechTag: ("home.projects", "home.career"),
+    Recognition: ("home.recognitions",),
+    Hobby: ("home.hobbies",),
+    Testimonial: ("home.testimonials",),
+}
+
+
+def invalidate_model(model):
+    """Retire the fragments ``model`` renders into, plus every cached page.
+
+    For changes no post_save reports, such as ``queryset.update()``.
+    """
+    invalidate_content(FRAGMENT_DEPENDENCIES.get(model, ()))
+
+
+@contextmanager
+def coalesce_invalidations():
+    """Defer invalidate_content() calls made inside the block until it exits."""
+    _pending.held += 1
+    try:
+        yield
+    finally:
+        _pending.held -= 1
+        if not _pending.held and _pending.dirty:
+            transaction.on_commit(_flush_invalidations)
+
+
+def _flush_invalidations():
+    if not _pending.dirty:
+        return
+    fragments, _pending.fragments, _pending.dirty = _pending.fragments, set(), False
+    cache.delete_many(
+        [
+            # Each {% cache %} block varies on LANGUAGE_CODE.
+            make_template_fragment_key(name, [language])
+            for name in fragments
+            for language, _label in settings.LANGUAGES
+        ]
+    )
+    # The bump also retires the home snapshot; main.snapshot rebuilds it on
+    # the next read (or during the warm-up), never on the committing thread.
+    bump_content_version()
+    if getattr(settings, "HOME_CACHE_WARMUP", False):
+        schedule_warmup()
+
+
+def warmup_hosts():
+    """Hosts the page cache is keyed on: the concrete entries of ALLOWED_HOSTS."""
+    hosts = [host for host in settings.ALLOWED_HOSTS if host and "*" not in host]
+    return [host.lstrip(".") for host in hosts] or ["localhost"]
+
+
+def _home_request(host, path, secure):
+    """A bare GET for ``path`` on ``host``, as the WSGI server would build it."""
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": host,
+        "SERVER_PORT": "443" if secure else "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": host,
+        "wsgi.url_scheme": "https" if secure else "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+    }
+    if secure:
+        # As the TLS-terminating proxy sends it (SECURE_PROXY_SSL_HEADER).
+        environ["HTTP_X_FORWARDED_PROTO"] = "https"
+    return WSGIRequest(environ)
+
+
+def warm_home_page(hosts=None, secure=None):
+    """Render the home page for every language and host into the cache.
+
+    Requests go through the project's own middleware stack, as the WSGI
+    server would send them, so host validation, locale and the page cache
+    behave exactly as for a visitor. Fragments are shared by all hosts; whole
+    pages are cached per absolute URL, so each host the site is served under
+    is rendered separately. Returns a list of ``(url, status_code)``.
+    """
+    if secure is None:
+        secure = getattr(settings, "SECURE_SSL_REDIRECT", False)
+    handler = WSGIHandler()
+    results = []
+    for host in hosts or warmup_hosts():
+        for language, _label in settings.LANGUAGES:
+            with override(language):
+                path = reverse("home")
+            response = handler.get_response(_home_request(host, path, secure))
+            results.append(
+                (f"{'https' if secure else 'http'}://{host}{path}", response.status_code)
+            )
+    return results
+
+
+_warmup_lock = threading.Lock()
+_warmup_timer = None
+
+
+def schedule_warmup(delay=None):
+    """Re-render the home page in a background thread after ``delay`` seconds.
+
+    Further calls while a warm-up is pending are folded into it. With a
+    per-process cache only this process is warmed.
+    """
+    global _warmup_timer
+    with _warmup_lock:
+        if _warmup_timer is not None:
+            return
+        _warmup_timer = threading.Timer(WARMUP_DELAY if delay is None else delay, _warm_in_thread)
+        _warmup_timer.daemon = True
+        _warmup_timer.start()
+
+
+def _warm_in_thread():
+    global _warmup_timer
+    with _warmup_lock:
+        _warmup_timer = None
+    started = time.monotonic()
+    try:
+        warm_home_page()
+    except Exception:
+        logger.exception("Home page warm-up failed")
+    else:
+        logger.info("Home page warmed in %.2fs", time.monotonic() - started)
+    finally:
+        # One-shot thread: release the connection it opened.
+        connections.close_all()
+
+
+def is_page_cacheable(request):
+    """Only anonymous GET/HEAD requests without a query string or pending
+    flash messages get a shared page — anything else renders per-request."""
+    if request.method not in ("GET", "HEAD") or request.GET:
+        return False
+    if request.user.is_authenticated:
+        return False
+    # len() loads pending messages without marking them as read.
+    return not len(get_messages(request))
+
+
+def home_etag(request, *args, **kwargs):
+    """Strong ETag for the home page; None disables conditional handling.
+
+    Only the CSRF token differs between responses with the same tag, and the
+    copy a client already holds keeps a token that is valid for its cookie.
+    """
+    if not is_page_cacheable(request):
+        return None
+    return f'"{get_content_version()}-{get_language()}-{timezone.localdate().isoformat()}"'
+
+
+def home_last_modified(request, *args, **kwargs):
+    if not is_page_cacheable(request):
+        return None
+    _version, updated_at = get_content_stamp()
+    # {% now %} renders today's date, so the page changes at midnight regardless.
+    midnight = timezone.make_aware(
+        datetime.datetime.combine(timezone.localdate(), datetime.time.min)
+    )
+    return max(updated_at, midnight)
+
+
+def page_cache_key(request):
+    """Return the cache key for this request's page, or None if it must not be cached."""
+    if not is_page_cacheable(request):
+        return None
+
+    url_hash = hashlib.md5(request.build_absolute_uri().encode(), usedforsecurity=False)
+    # The date is part of the key because {% now %} renders it in the page.
+    today = timezone.localdate().isoformat()
+    return f"home:page:{get_content_version()}:{get_language()}:{today}:{url_hash.hexdigest()}"
+
+
+def cached_page_response(request, key):
+    """Return the cached page for ``key`` with this request's CSRF token, or None."""
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    content, content_type = cached
+    return _with_csrf_token(request, HttpResponse(content, content_type=content_type))
+
+
+def cache_page_response(request, key, response):
+    """Store a page rendered with CSRF_TOKEN_PLACEHOLDER and return it ready to send."""
+    if response.status_code == 200:
+        cache.set(key, (response.content, response["Content-Type"]), PAGE_CACHE_TIMEOUT)
+    return _with_csrf_token(request, response)
+
+
+def _with_csrf_token(request, response):
+    # get_token() also flags the CSRF cookie for (re)sending by CsrfViewMiddleware.
+    token = get_token(request).encode()
+    response.content = response.content.replace(CSRF_TOKEN_PLACEHOLDER.encode(), token)
+    return response
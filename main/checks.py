@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PER_PROCESS_CACHES = ("django.core.cache.backends.locmem.LocMemCache",)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_page_cache(app_configs, **kwargs):
+    """Warn, under ``check --deploy``, when home pages and fragments are cached per process.
+
+    main.caching only retires {% cache %} fragments in the process that
+    committed the change, so with several workers the others keep serving
+    their old fragments until they expire.
+    """
+    if settings.CACHES["default"]["BACKEND"] not in PER_PROCESS_CACHES:
+        return []
+    return [
+        Warning(
+            "The default cache is per process, so content edits reach other "
+            "workers' home page fragments only when they expire (up to an hour).",
+            hint="Set REDIS_URL, or run a single worker.",
+            id="main.W001",
+        )
+    ]
@@ -0,0 +1,156 @@
+"""Read-only loaders for the home page's translated content.
+
+Each section is fetched in one query: the model joined to its translation in
+the active language and in parler's fallback language, with the visible text
+picked in SQL. The template gets plain records instead of parler models, so
+rendering never triggers per-object translation lookups. main.snapshot
+materializes these records per language.
+"""
+
+from collections import defaultdict
+from types import SimpleNamespace
+
+from django.db.models import Case, F, FilteredRelation, Q, When
+from django.utils.translation import get_language
+from parler.utils.i18n import get_active_language_choices
+
+from .models import Education, Experience, Hobby, Project, Recognition, Skill, Testimonial
+
+
+class Record(SimpleNamespace):
+    """One row of home page content, already in the visible language."""
+
+
+def translated_values(queryset, fields, translated, language=None):
+    """``values()`` rows of ``queryset`` with ``translated`` fields resolved.
+
+    Like parler, a row's translation in ``language`` is used whole if it
+    exists; otherwise the first fallback language that has one.
+    """
+    languages = get_active_language_choices(language or get_language())
+    aliases = {}
+    for index, code in enumerate(languages):
+        alias = f"_t{index}"
+        aliases[alias] = FilteredRelation(
+            "translations", condition=Q(translations__language_code=code)
+        )
+    resolved = {
+        field: Case(
+            *(
+                When(**{f"{alias}__id__isnull": False}, then=F(f"{alias}__{field}"))
+                for alias in aliases
+            )
+        )
+        for field in translated
+    }
+    return queryset.alias(**aliases).values(*fields, **resolved)
+
+
+def _records(rows, model, file_fields=(), choice_fields=()):
+    records = []
+    for row in rows:
+        record = Record(**row)
+        for name in file_fields:
+            field = model._meta.get_field(name)
+            setattr(record, name, field.attr_class(None, field, row[name] or ""))
+        for name in choice_fields:
+            choices = dict(model._meta.get_field(name).flatchoices)
+            setattr(record, f"get_{name}_display", choices.get(row[name], row[name]))
+        records.append(record)
+    return records
+
+
+def _tech_tags(through, owner_field, owner_ids):
+    """``{owner pk: [tag records]}`` for an M2M to TechTag, in one query."""
+    tags = defaultdict(list)
+    rows = (
+        through.objects.filter(**{f"{owner_field}__in": owner_ids})
+        .order_by("techtag__name")
+        .values_list(owner_field, "techtag__name")
+    )
+    for owner_id, name in rows:
+        tags[owner_id].append(Record(name=name))
+    return tags
+
+
+def load_skills(language=None):
+    rows = translated_values(Skill.objects.all(), ["id", "category", "order"], ["name"], language)
+    return _records(rows, Skill, choice_fields=["category"])
+
+
+def load_projects(language=None):
+    rows = translated_values(
+        Project.objects.order_by("-created_date"),
+        [
+            "id",
+            "image",
+            "code_link",
+            "demo_link",
+            "created_date",
+            "start_date",
+            "end_date",
+            "tech_stack",
+        ],
+        ["title", "description", "role"],
+        language,
+    )
+    projects = _records(rows, Project, file_fields=["image"])
+    tags = _tech_tags(Project.tech_tags.through, "project_id", [p.id for p in projects])
+    for project in projects:
+        project.tech_tags = tags[project.id]
+        project.date_range = Project.date_range.fget(project)
+    return projects
+
+
+def load_experiences(language=None):
+    rows = translated_values(
+        Experience.objects.order_by("-start_date"),
+        ["id", "role_type", "is_current", "start_date", "end_date", "icon"],
+        ["job_title", "company", "description"],
+        language,
+    )
+    experiences = _records(rows, Experience, choice_fields=["role_type"])
+    tags = _tech_tags(Experience.tech_used.through, "experience_id", [e.id for e in experiences])
+    for experience in experiences:
+        experience.tech_used = tags[experience.id]
+    return experiences
+
+
+def load_educations(language=None):
+    rows = translated_values(
+        Education.objects.order_by("-start_date"),
+        ["id", "start_date", "end_date"],
+        ["degree", "institution"],
+        language,
+    )
+    return _records(rows, Education)
+
+
+def load_recognitions(language=None):
+    rows = translated_values(
+        Recognition.objects.order_by("order"),
+        ["id", "date_text", "icon_emoji", "order"],
+        ["title", "subtitle", "description"],
+        language,
+    )
+    return _records(rows, Recognition)
+
+
+def load_hobbies(language=None):
+    rows = translated_values(
+        Hobby.objects.order_by("pk"),
+        ["id", "icon", "font_awesome_icon"],
+        ["name", "description"],
+        language,
+    )
+    return _records(rows, Hobby, file_fields=["icon"])
+
+
+def load_testimonials(language=None):
+    rows = translated_values(
+        Testimonial.objects.filter(is_approved=True).order_by("-created_at"),
+        ["id", "name", "created_at"],
+        ["role_company", "quote"],
+        language,
+    )
+    return _records(rows, Testimonial)
@@ -0,0 +1,55 @@
+"""Admin badge counts, kept in the shared cache and adjusted as rows change.
+
+Every admin page shows how many testimonials await approval and how many
+contact messages there are. Counting those rows on each render grows with
+spam volume, so the counts live in the cache instead: only a miss counts the
+rows, and main.signals (plus the bulk admin actions, which send no signals)
+adjust the cached value after each commit. The timeout bounds any drift, e.g.
+between gunicorn workers when LocMemCache is the only cache.
+"""
+
+import contextlib
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import ContactMessage, Testimonial
+
+COUNTERS = {
+    "pending_testimonials": lambda: Testimonial.objects.filter(is_approved=False).count(),
+    "messages": lambda: ContactMessage.objects.count(),
+}
+
+COUNTER_TIMEOUT = 600
+
+
+def _key(name):
+    return f"admin:count:{name}"
+
+
+def get_count(name):
+    """The cached value of counter ``name``, counted from the database on a miss."""
+    key = _key(name)
+    count = cache.get(key)
+    if count is None:
+        # Adjustments to a missing key are dropped, so seed it first and then
+        # count again: the recount includes whatever committed while the first
+        # COUNT ran. Only an adjustment landing between the recount and the
+        # set() is lost, until COUNTER_TIMEOUT.
+        if not cache.add(key, COUNTERS[name](), COUNTER_TIMEOUT):
+            return cache.get(key, 0)  # seeded by a concurrent miss
+        count = COUNTERS[name]()
+        cache.set(key, count, COUNTER_TIMEOUT)
+    return count
+
+
+def _apply(name, delta):
+    # A missing key needs no adjusting; the next get_count() recounts.
+    with contextlib.suppress(ValueError):
+        cache.incr(_key(name), delta)
+
+
+def adjust_count(name, delta):
+    """Add ``delta`` to counter ``name`` once the current transaction commits."""
+    if delta:
+        transaction.on_commit(lambda: _apply(name, delta))
@@ -0,0 +1,96 @@
+"""Background drains for the database-backed job queues (translations, images).
+
+A ``Drain`` runs its queue's drain function on a small thread pool, at most
+one pass per slot. A wakeup that arrives while every slot is busy is not
+dropped: it asks a running pass to go round again once it finishes, so a job
+queued or re-armed mid-drain is always picked up. When the last pass ends,
+jobs it left behind (failed attempts waiting for a retry, or RUNNING jobs of a
+dead worker whose lease has yet to expire) schedule a timed wakeup, backing
+off with each failed attempt.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+from django.db.models import Min
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# First retry of a failed job, in seconds; doubles with every further attempt.
+RETRY_DELAY = 30.0
+
+
+def next_wakeup(model, lease):
+    """Seconds until a left-over job of ``model`` is worth another pass, or None."""
+    delays = []
+    attempts = model.objects.filter(status=model.STATUS_PENDING).aggregate(n=Min("attempts"))["n"]
+    if attempts is not None:
+        delays.append(RETRY_DELAY * 2 ** max(attempts - 1, 0))
+    touched = model.objects.filter(status=model.STATUS_RUNNING).aggregate(t=Min("updated_at"))["t"]
+    if touched is not None:
+        # A second past the lease, so claim_next_job() sees it as stale.
+        delays.append(max((touched + lease - timezone.now()).total_seconds(), 0) + 1)
+    return min(delays, default=None)
+
+
+class Drain:
+    """Runs ``drain()`` in background threads, never losing a wakeup.
+
+    ``wakeup()``, if given, returns the seconds until jobs left behind by
+    the last pass should be tried again (None when there are none).
+    """
+
+    def __init__(self, name, drain, wakeup=None):
+        self.name = name
+        self._drain = drain
+        self._wakeup = wakeup
+        self._lock = threading.Lock()
+        self._executor = None
+        self._active = 0
+        self._rerun = False
+        self._timer = None
+
+    def start(self, slots=1):
+        """Start a pass, or have a running one go round again if all ``slots`` are busy."""
+        with self._lock:
+            if self._active >= slots:
+                self._rerun = True
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=slots, thread_name_prefix=self.name)
+            self._active += 1
+        self._executor.submit(self._run, slots)
+
+    def _run(self, slots):
+        try:
+            while True:
+                try:
+                    self._drain()
+                except Exception:
+                    logger.exception("%s worker crashed", self.name.capitalize())
+                with self._lock:
+                    if not self._rerun:
+                        self._active -= 1
+                        last = not self._active
+                        break
+                    self._rerun = False
+            if last and self._wakeup is not None:
+                self._schedule(self._wakeup(), slots)
+        except Exception:
+            logger.exception("Scheduling the next %s pass failed", self.name)
+        finally:
+            close_old_connections()
+
+    def _schedule(self, delay, slots):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if delay is None:
+                return
+            self._timer = threading.Timer(delay, self.start, args=(slots,))
+            self._timer.daemon = True
+            self._timer.start()
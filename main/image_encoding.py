@@ -0,0 +1,49 @@
+"""Pillow work for image derivatives, kept free of Django imports.
+
+main.images runs ``render_derivatives`` in a process pool, whose workers are
+spawned fresh and import only this module.
+"""
+
+import io
+
+from PIL import Image, ImageOps
+
+
+def target_widths(widths, original_width):
+    """``widths`` below the original's, topped up with the original's (capped) width."""
+    targets = {width for width in widths if width < original_width}
+    targets.add(min(original_width, widths[-1]))
+    return sorted(targets)
+
+
+def _open(data):
+    image = Image.open(io.BytesIO(data))
+    image = ImageOps.exif_transpose(image)
+    image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    return image
+
+
+def _encode(image, width, fmt, quality):
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    resized.save(buffer, fmt.upper(), quality=quality)
+    return buffer.getvalue()
+
+
+def render_derivatives(data, widths, quality, skip=()):
+    """Encode the image bytes ``data`` at each target width, per format in ``quality``.
+
+    Returns ``{(width, fmt): bytes}``, leaving out the ``(width, fmt)`` pairs in
+    ``skip``. Raises OSError for data Pillow cannot read.
+    """
+    image = _open(data)
+    return {
+        (width, fmt): _encode(image, width, fmt, fmt_quality)
+        for fmt, fmt_quality in quality.items()
+        for width in target_widths(widths, image.width)
+        if (width, fmt) not in skip
+    }
@@ -0,0 +1,486 @@
+"""Resized WebP/AVIF derivatives of uploaded images, for srcset.
+
+Each original is re-encoded at the fixed widths its field is displayed at
+(plus 2x), capped at the original's own width, and stored next to it as
+``<original name>.<width>w.<ext>`` (with main.storage, a content hash goes
+before the extension). The names carry everything a template
+needs, so the variants of an image are found with one directory listing,
+cached until the image is rebuilt. Missing derivatives are never built during
+a request: templates fall back to the original until they exist.
+
+Building happens off the request thread. Saving a row with a new upload
+records an ImageJob and, once the transaction commits, nudges a drain thread.
+The drain hashes each original, copies the derivatives of an earlier upload
+with the same content if there is one, and otherwise hands the Pillow work to
+a small process pool. ``manage.py build_derivatives`` drains or backfills the
+queue from the command line. The hero video rides the same queue; main.videos
+covers what is built for it.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import posixpath
+import re
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile, File
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import features
+
+from .caching import coalesce_invalidations, invalidate_model
+from .drains import Drain, next_wakeup
+from .image_encoding import render_derivatives
+from .models import HeroSlide, Hobby, ImageJob, Profile, Project
+from .video_encoding import render_video_derivatives
+from .videos import (
+    VIDEO_RENDITIONS,
+    ffmpeg_binary,
+    forget_video_derivatives,
+    local_path,
+    scan_video_derivatives,
+    video_derivative_name,
+)
+
+logger = logging.getLogger(__name__)
+
+# Widths to build per image field, ascending.
+DERIVATIVE_WIDTHS = {
+    (Project, "image"): (320, 640, 1280),
+    (Profile, "profile_picture"): (288, 576),
+    (Profile, "hero_static_image"): (640, 1280, 1920),
+    (HeroSlide, "image"): (640, 1280, 1920),
+    (Hobby, "icon"): (28, 56),
+}
+
+# Every file field the queue builds derivatives for.
+DERIVED_FIELDS = {**DERIVATIVE_WIDTHS, **VIDEO_RENDITIONS}
+
+# Most efficient first; a <picture> offers them to the browser in this order.
+FORMATS = ("avif", "webp")
+QUALITY = {"avif": 55, "webp": 80}
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+DERIVATIVES_CACHE_TIMEOUT = 24 * 3600
+
+# A job is retried this many times before it is parked as FAILED.
+MAX_ATTEMPTS = 3
+
+# A RUNNING job not touched for this long belongs to a dead worker and is reclaimed.
+JOB_LEASE = timedelta(minutes=10)
+
+
+def video_job_lease():
+    """The lease of a video job: ffmpeg's worst case, plus JOB_LEASE to spare.
+
+    Nothing touches a job while ffmpeg runs, so a shorter lease would let
+    another drain reclaim a slow transcode and run it a second time.
+    """
+    # Up to two tries for the poster frame, then one run per rendition.
+    runs = 2 + max(len(heights) for heights in VIDEO_RENDITIONS.values())
+    return runs * timedelta(seconds=getattr(settings, "FFMPEG_TIMEOUT", 600)) + JOB_LEASE
+
+
+def _video_jobs():
+    """Matches the jobs of video fields."""
+    video = Q()
+    for model, field_name in VIDEO_RENDITIONS:
+        video |= Q(model_label=model._meta.label_lower, field=field_name)
+    return video
+
+
+def available_formats():
+    """The derivative formats this Pillow build can encode."""
+    return [fmt for fmt in FORMATS if features.check(fmt)]
+
+
+def derivative_name(name, width, fmt):
+    return f"{name}.{width}w.{fmt}"
+
+
+def _derivative_pattern(name):
+    base = re.escape(posixpath.basename(name))
+    # A content-hashing storage inserts its hash before the extension.
+    return re.compile(rf"^{base}\.(\d+)w(?:\.[0-9a-f]+)?\.({'|'.join(FORMATS)})$")
+
+
+def _cache_key(name):
+    return f"image:derivatives:{hashlib.sha1(name.encode()).hexdigest()}"
+
+
+def scan_derivatives(name, storage, use_cache=True):
+    """``{(width, fmt): name}`` for the derivatives of the original ``name``."""
+    key = _cache_key(name)
+    if use_cache and (found := cache.get(key)) is not None:
+        return found
+    pattern = _derivative_pattern(name)
+    directory = posixpath.dirname(name)
+    try:
+        _dirs, files = storage.listdir(directory)
+    except FileNotFoundError:
+        files = []
+    found = {}
+    for filename in files:
+        if match := pattern.match(filename):
+            width, fmt = int(match[1]), match[2]
+            found[(width, fmt)] = posixpath.join(directory, filename)
+    cache.set(key, found, DERIVATIVES_CACHE_TIMEOUT)
+    return found
+
+
+def derivative_sources(fieldfile):
+    """``[(mime type, [(width, url), ...])]`` for ``fieldfile``, most efficient format first."""
+    if not fieldfile:
+        return []
+    storage = fieldfile.storage
+    found = scan_derivatives(fieldfile.name, storage)
+    sources = []
+    for fmt in FORMATS:
+        candidates = sorted((width, name) for (width, f), name in found.items() if f == fmt)
+        if candidates:
+            urls = [(width, storage.url(name)) for width, name in candidates]
+            sources.append((MIME_TYPES[fmt], urls))
+    return sources
+
+
+def _slideshow_key(version):
+    return f"image:slideshow:{version}"
+
+
+def slideshow_sources(profile):
+    """``[{"src": url, "sources": [(mime type, srcset)]}]`` for the hero slides, in order.
+
+    Cached under the Profile's load() version, which slide edits and finished
+    slide derivatives bump, so a warm slideshow costs one cache read.
+    """
+    version = cache.get(Profile.load_version_key())
+    if version is not None and (slides := cache.get(_slideshow_key(version))) is not None:
+        return slides
+    slides = [
+        {
+            "src": slide.image.url,
+            "sources": [
+                (mime, ", ".join(f"{url} {width}w" for width, url in urls))
+                for mime, urls in derivative_sources(slide.image)
+            ],
+        }
+        for slide in HeroSlide.objects.filter(profile=profile)
+        if slide.image
+    ]
+    if version is not None:
+        cache.set(_slideshow_key(version), slides, DERIVATIVES_CACHE_TIMEOUT)
+    return slides
+
+
+def delete_derivatives(name, storage):
+    """Delete the derivatives of the original ``name`` and forget its job."""
+    for scan in (scan_derivatives, scan_video_derivatives):
+        for derivative in scan(name, storage, use_cache=False).values():
+            storage.delete(derivative)
+    cache.delete(_cache_key(name))
+    forget_video_derivatives(name)
+    ImageJob.objects.filter(name=name).delete()
+
+
+def content_hash(storage, name):
+    digest = hashlib.sha256()
+    with storage.open(name) as handle:
+        for chunk in handle.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write(storage, name, content, replaces=None):
+    """Store a derivative, then delete ``replaces``, the earlier build of it.
+
+    ``content`` is the encoded bytes, or the local path ffmpeg wrote them to.
+
+    A content-hashing storage names each build after its bytes, so a rebuild
+    lands beside the old file rather than over it; left there, the scan
+    would find two files for one width.
+    """
+    if storage.exists(name):  # a storage that keeps names as given
+        storage.delete(name)
+    if isinstance(content, bytes):
+        saved = storage.save(name, ContentFile(content))
+    else:
+        with open(content, "rb") as handle:
+            saved = storage.save(name, File(handle))
+    if replaces and replaces not in (name, saved):
+        storage.delete(replaces)
+    return saved
+
+
+# ─── Job queue ───────────────────────────────────────────────────
+def enqueue_derivatives(instance):
+    """Queue derivative builds for the uploads of ``instance`` not seen before."""
+    queued = False
+    for model, field_name in DERIVED_FIELDS:
+        fieldfile = getattr(instance, field_name) if isinstance(instance, model) else None
+        if not fieldfile:
+            continue
+        try:
+            with transaction.atomic():
+                _job, created = ImageJob.objects.get_or_create(
+                    name=fieldfile.name,
+                    defaults={"model_label": model._meta.label_lower, "field": field_name},
+                )
+        except IntegrityError:
+            continue  # queued by a concurrent save of the same upload
+        queued = queued or created
+    if queued:
+        transaction.on_commit(_start_drain)
+    return queued
+
+
+def enqueue_all():
+    """Queue every stored upload that has no job yet; returns how many were queued."""
+    known = set(ImageJob.objects.values_list("name", flat=True))
+    jobs = []
+    for model, field_name in DERIVED_FIELDS:
+        names = (
+            model.objects.exclude(**{field_name: ""})
+            .exclude(**{f"{field_name}__isnull": True})
+            .values_list(field_name, flat=True)
+        )
+        for name in names:
+            if name not in known:
+                known.add(name)
+                jobs.append(
+                    ImageJob(name=name, model_label=model._meta.label_lower, field=field_name)
+                )
+    ImageJob.objects.bulk_create(jobs, ignore_conflicts=True)
+    return len(jobs)
+
+
+def _start_drain():
+    """Hand the queue to the drain thread; its Pillow work runs in a process pool."""
+    if getattr(settings, "IMAGE_WORKERS", 1) <= 0:
+        return
+    _drain.start()
+
+
+def resume_jobs():
+    """Drain image jobs left queued by a previous worker; run when a gunicorn worker boots."""
+    _start_drain()
+
+
+def _drain_in_thread():
+    workers = getattr(settings, "IMAGE_WORKERS", 1)
+    # Spawned, not forked: forking a threaded web worker can copy held locks.
+    # The pool lives for one pass only, so idle web workers keep no encoder
+    # processes around; it starts none at all when the queue is empty.
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        process_image_jobs(pool, batch_size=workers)
+
+
+def claim_next_job(exclude=()):
+    """Atomically move the oldest runnable job to RUNNING and return it, or None."""
+    now = timezone.now()
+    video = _video_jobs()
+    stale = (
+        Q(updated_at__lt=now - JOB_LEASE) & ~video
+        | Q(updated_at__lt=now - video_job_lease()) & video
+    )
+    runnable = ImageJob.objects.filter(
+        Q(status=ImageJob.STATUS_PENDING) | Q(stale, status=ImageJob.STATUS_RUNNING)
+    ).exclude(pk__in=exclude)
+    for job in runnable.order_by("created_at")[:10]:
+        claimed = ImageJob.objects.filter(pk=job.pk, status=job.status).update(
+            status=ImageJob.STATUS_RUNNING,
+            attempts=F("attempts") + 1,
+            updated_at=timezone.now(),
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def _mark_failed(job, exc):
+    status = ImageJob.STATUS_FAILED if job.attempts >= MAX_ATTEMPTS else ImageJob.STATUS_PENDING
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=status, last_error=str(exc)[:1000], updated_at=timezone.now()
+    )
+
+
+def _mark_done(job):
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=ImageJob.STATUS_DONE,
+        content_hash=job.content_hash,
+        last_error="",
+        updated_at=timezone.now(),
+    )
+
+
+def _field(job):
+    return apps.get_model(job.model_label)._meta.get_field(job.field)
+
+
+def _image_derivative_name(name, key):
+    return derivative_name(name, *key)
+
+
+def _park_without_ffmpeg(job):
+    # Not worth retrying until someone installs ffmpeg and runs --retry-failed.
+    logger.warning("ffmpeg not found; %s plays without poster or renditions", job.name)
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=ImageJob.STATUS_FAILED, last_error="ffmpeg not found", updated_at=timezone.now()
+    )
+
+
+def _copy_from_twin(job, storage, existing, scan, name_for):
+    """Copy the derivatives of an earlier upload with the same bytes; False if there is none."""
+    twins = (
+        ImageJob.objects.filter(content_hash=job.content_hash, status=ImageJob.STATUS_DONE)
+        .exclude(pk=job.pk)
+        .values_list("name", flat=True)
+    )
+    for twin in twins:
+        found = scan(twin, storage, use_cache=False)
+        if not found:
+            continue
+        for key, source in found.items():
+            if key not in existing:
+                with storage.open(source) as handle:
+                    _write(storage, name_for(job.name, key), handle.read())
+        return True
+    return False
+
+
+def _submit(executor, fn, *args):
+    if executor is not None:
+        return executor.submit(fn, *args)
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+
+def run_image_jobs(jobs, executor=None):
+    """Build derivatives for a batch of claimed jobs; returns ``(succeeded, failed)``.
+
+    Hashing and copying happen here; encoding is submitted to ``executor``
+    (inline when None), so a batch encodes its images in parallel.
+    """
+    # Holds local copies of videos, and ffmpeg's output, until they are stored.
+    with ExitStack() as stack:
+        return _run_image_jobs(jobs, executor, stack)
+
+
+def _run_image_jobs(jobs, executor, stack):
+    quality = {fmt: QUALITY[fmt] for fmt in available_formats()}
+    timeout = getattr(settings, "FFMPEG_TIMEOUT", 600)
+    succeeded = failed = 0
+    renders = []  # (job, storage, scan, name_for, future)
+    for job in jobs:
+        try:
+            field = _field(job)
+            storage = field.storage
+            if not storage.exists(job.name):
+                ImageJob.objects.filter(pk=job.pk).delete()  # replaced or deleted since
+                succeeded += 1
+                continue
+            key = (field.model, field.name)
+            is_video = key in VIDEO_RENDITIONS
+            if is_video and not (ffmpeg := ffmpeg_binary()):
+                _park_without_ffmpeg(job)
+                failed += 1
+                continue
+            scan = scan_video_derivatives if is_video else scan_derivatives
+            name_for = video_derivative_name if is_video else _image_derivative_name
+            job.content_hash = content_hash(storage, job.name)
+            existing = scan(job.name, storage, use_cache=False)
+            if _copy_from_twin(job, storage, existing, scan, name_for):
+                _finish(job, storage)
+                succeeded += 1
+                continue
+            if is_video:
+                path = stack.enter_context(local_path(storage, job.name))
+                directory = stack.enter_context(tempfile.TemporaryDirectory())
+                args = (path, VIDEO_RENDITIONS[key], ffmpeg, directory, existing, timeout)
+                future = _submit(executor, render_video_derivatives, *args)
+            else:
+                with storage.open(job.name) as handle:
+                    data = handle.read()
+                args = (data, DERIVATIVE_WIDTHS[key], quality, existing)
+                future = _submit(executor, render_derivatives, *args)
+            renders.append((job, storage, scan, name_for, future))
+        except Exception as exc:
+            logger.exception("Derivatives failed for %s", job)
+            _mark_failed(job, exc)
+            failed += 1
+
+    for job, storage, scan, name_for, future in renders:
+        try:
+            rendered = future.result()
+            current = scan(job.name, storage, use_cache=False)
+            for key, content in rendered.items():
+                _write(storage, name_for(job.name, key), content, current.get(key))
+        except OSError as exc:
+            # Not a file Pillow/ffmpeg can read (or the storage failed): retry, then park.
+            logger.warning("Cannot build derivatives of %s: %s", job.name, exc)
+            _mark_failed(job, exc)
+            failed += 1
+        except Exception as exc:
+            logger.exception("Derivatives failed for %s", job)
+            _mark_failed(job, exc)
+            failed += 1
+        else:
+            _finish(job, storage)
+            succeeded += 1
+    return succeeded, failed
+
+
+def _finish(job, storage):
+    _mark_done(job)
+    cache.delete(_cache_key(job.name))
+    forget_video_derivatives(job.name)
+    model = apps.get_model(job.model_label)
+    if model is HeroSlide:
+        Profile.invalidate_load_cache()  # retires the cached slideshow_sources()
+    # Pages rendered meanwhile fell back to the original; retire them.
+    invalidate_model(model)
+
+
+def process_image_jobs(executor=None, batch_size=1, limit=None, progress=None):
+    """Drain the queue in batches; returns ``(succeeded, failed)`` counts.
+
+    ``progress``, if given, is called with the running counts after each batch.
+    Each job is tried at most once per drain.
+    """
+    succeeded = failed = 0
+    seen = []
+    while limit is None or succeeded + failed < limit:
+        room = batch_size if limit is None else min(batch_size, limit - succeeded - failed)
+        jobs = []
+        while len(jobs) < room and (job := claim_next_job(exclude=seen)) is not None:
+            seen.append(job.pk)
+            jobs.append(job)
+        if not jobs:
+            break
+        # One page/fragment invalidation per batch rather than one per image.
+        with coalesce_invalidations():
+            ok, bad = run_image_jobs(jobs, executor)
+        succeeded += ok
+        failed += bad
+        if progress:
+            progress(succeeded, failed)
+    return succeeded, failed
+
+
+# Waking up on the longer video lease may leave a dead worker's image job
+# waiting past its own lease, but never wakes up before a claim can succeed.
+_drain = Drain("images", _drain_in_thread, lambda: next_wakeup(ImageJob, video_job_lease()))
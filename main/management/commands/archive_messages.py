@@ -0,0 +1,52 @@
+"""Move old contact messages out of the database into a gzipped JSONL archive.
+
+Usage:  python manage.py archive_messages                  # older than 180 days
+        python manage.py archive_messages --days 30 --dry-run
+        python manage.py archive_messages --days 30 --output /backups/messages.jsonl.gz
+
+Archives are written to ARCHIVE_ROOT unless --output is given; an existing
+--output file is appended to. Rows are deleted in --batch-size chunks, each
+in its own transaction, once they are in the file.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.archive import BATCH_SIZE, archive_messages, older_than
+
+
+class Command(BaseCommand):
+    help = "Archive and delete contact messages older than N days."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=180, help="Archive messages older than this (default: 180)."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Rows per delete transaction (default: {BATCH_SIZE}).",
+        )
+        parser.add_argument("--output", help="Archive file (default: a new file in ARCHIVE_ROOT).")
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only count the messages that would be archived."
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0 or options["batch_size"] < 1:
+            raise CommandError("--days must be 0 or more and --batch-size at least 1.")
+        messages = older_than(options["days"])
+        if options["dry_run"]:
+            self.stdout.write(f"Would archive {messages.count()} message(s).")
+            return
+
+        def progress(archived):
+            self.stdout.write(f"  {archived} archived")
+
+        archived, path = archive_messages(
+            messages, options["batch_size"], options["output"], progress
+        )
+        if path:
+            self.stdout.write(self.style.SUCCESS(f"Archived {archived} message(s) to {path}."))
+        else:
+            self.stdout.write("No messages to archive.")
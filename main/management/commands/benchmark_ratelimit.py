@@ -0,0 +1,95 @@
+"""Measure the per-check latency of the rate-limit cache, and check it counts exactly.
+
+Usage:  python manage.py benchmark_ratelimit
+        python manage.py benchmark_ratelimit --processes 4 --checks 5000
+        python manage.py benchmark_ratelimit --cache default
+
+Each check is what django-ratelimit does per request: ``add()`` the window's
+counter, or ``incr()`` it when it already exists. The processes share a few
+keys, as concurrent requests from one client would, and the final counts must
+add up to the number of checks.
+"""
+
+import multiprocessing
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+
+KEYS = 4
+
+
+def _check(cache, key):
+    if not cache.add(key, 1, 3600):
+        cache.incr(key)
+
+
+def _run(alias, prefix, checks, results):
+    cache = caches[alias]
+    timings = []
+    for i in range(checks):
+        start = time.perf_counter()
+        _check(cache, f"{prefix}:{i % KEYS}")
+        timings.append(time.perf_counter() - start)
+    results.put(timings)
+
+
+class Command(BaseCommand):
+    help = "Benchmark rate-limit checks against a cache and verify the counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cache",
+            default=getattr(settings, "RATELIMIT_USE_CACHE", "default"),
+            help="Cache alias (default: RATELIMIT_USE_CACHE).",
+        )
+        parser.add_argument("--checks", type=int, default=2000, help="Checks per process.")
+        parser.add_argument(
+            "--processes", type=int, default=4, help="Concurrent processes (default: 4)."
+        )
+
+    def handle(self, *args, **options):
+        alias, checks, processes = options["cache"], options["checks"], options["processes"]
+        if alias not in settings.CACHES:
+            raise CommandError(f"No cache named {alias!r}.")
+        if checks < 2:
+            raise CommandError("--checks must be at least 2 to report percentiles.")
+        if processes < 1:
+            raise CommandError("--processes must be at least 1.")
+        backend = settings.CACHES[alias]["BACKEND"]
+        prefix = f"ratelimit-benchmark:{uuid.uuid4().hex}"
+
+        # Forked, so children inherit the configured Django; none has opened
+        # the cache yet, so each gets its own connection.
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [
+            context.Process(target=_run, args=(alias, prefix, checks, results))
+            for _i in range(processes)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        timings = [t for _worker in workers for t in results.get()]
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        cache = caches[alias]
+        counted = sum(cache.get(f"{prefix}:{k}", 0) for k in range(KEYS))
+        cache.delete_many([f"{prefix}:{k}" for k in range(KEYS)])
+
+        timings.sort()
+        quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+        self.stdout.write(f"{backend} ({alias}), {processes} process(es) x {checks} checks")
+        self.stdout.write(
+            f"  per check: p50 {quantiles[49] * 1000:.3f} ms, p95 {quantiles[94] * 1000:.3f} ms, p99 {quantiles[98] * 1000:.3f} ms, max {timings[-1] * 1000:.3f} ms"
+        )
+        self.stdout.write(f"  throughput: {len(timings) / elapsed:.0f} checks/s")
+        total = checks * processes
+        if counted != total:
+            raise CommandError(f"Counted {counted} of {total} checks: increments were lost.")
+        self.stdout.write(self.style.SUCCESS(f"  counts exact: {counted} of {total}"))
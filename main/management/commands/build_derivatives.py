@@ -0,0 +1,74 @@
+"""Build queued image derivatives, optionally backfilling every stored image.
+
+Usage:  python manage.py build_derivatives                 # drain the queue and exit
+        python manage.py build_derivatives --all           # queue every image first
+        python manage.py build_derivatives --all --workers 4
+
+Pair with IMAGE_WORKERS=0 to keep all image encoding out of gunicorn.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from main.images import enqueue_all, process_image_jobs
+from main.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = "Build resized WebP/AVIF derivatives for uploaded images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Queue every stored image that has never been processed.",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Give FAILED jobs another round of attempts.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Encoder processes (default: one per CPU). 0 encodes in this process.",
+        )
+        parser.add_argument(
+            "--no-progress", action="store_true", help="Only print the final summary."
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        if workers < 0:
+            raise CommandError("--workers must be 0 or more.")
+        if options["all"]:
+            queued = enqueue_all()
+            self.stdout.write(f"Queued {queued} image(s).")
+        if options["retry_failed"]:
+            ImageJob.objects.filter(status=ImageJob.STATUS_FAILED).update(
+                status=ImageJob.STATUS_PENDING, attempts=0
+            )
+        total = ImageJob.objects.filter(
+            Q(status=ImageJob.STATUS_PENDING) | Q(status=ImageJob.STATUS_RUNNING)
+        ).count()
+
+        def progress(succeeded, failed):
+            if not options["no_progress"]:
+                self.stdout.write(f"  {succeeded + failed}/{total} ({failed} failed)")
+
+        if workers:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                succeeded, failed = process_image_jobs(
+                    executor, batch_size=workers, progress=progress
+                )
+        else:
+            succeeded, failed = process_image_jobs(progress=progress)
+
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(style(f"Derivatives built for {succeeded} image(s), {failed} failed."))
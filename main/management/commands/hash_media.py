@@ -0,0 +1,63 @@
+"""Rename uploads stored before content hashing to content-hashed names.
+
+Usage:  python manage.py hash_media --dry-run
+        python manage.py hash_media
+
+Each file field still pointing at an unhashed name is re-saved through the
+default storage, the row is updated in place, and the old file (with its
+derivatives) is deleted once nothing references it. Derivatives for the new
+names are queued; run ``build_derivatives`` afterwards to build them.
+"""
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from main.caching import invalidate_model
+from main.images import enqueue_all
+from main.storage import delete_orphaned_files, file_fields, is_hashed_name
+
+
+class Command(BaseCommand):
+    help = "Move uploads with pre-hashing names to content-hashed names."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true", help="List the files that would be renamed."
+        )
+
+    def handle(self, *args, **options):
+        renamed = {}
+        touched = set()
+        for model, field_name in file_fields():
+            rows = (
+                model._base_manager.exclude(**{field_name: ""})
+                .exclude(**{f"{field_name}__isnull": True})
+                .values_list("pk", field_name)
+            )
+            for pk, name in rows:
+                if is_hashed_name(name):
+                    continue
+                if not default_storage.exists(name):
+                    self.stderr.write(f"Missing: {name} ({model._meta.label_lower}#{pk})")
+                    continue
+                if options["dry_run"]:
+                    self.stdout.write(f"Would rename {name}")
+                    continue
+                if name not in renamed:
+                    with default_storage.open(name) as handle:
+                        renamed[name] = default_storage.save(name, handle)
+                # update() rather than save(): no signals, so the old file stays
+                # until every row that shares it has moved.
+                model._base_manager.filter(pk=pk).update(**{field_name: renamed[name]})
+                touched.add(model)
+                self.stdout.write(f"{name} -> {renamed[name]}")
+
+        for model in touched:
+            # Cached pages and singleton memos still point at the old names.
+            if hasattr(model, "invalidate_load_cache"):
+                model.invalidate_load_cache()
+            invalidate_model(model)
+        if renamed:
+            delete_orphaned_files(renamed)
+            enqueue_all()
+        self.stdout.write(self.style.SUCCESS(f"Renamed {len(renamed)} file(s)."))
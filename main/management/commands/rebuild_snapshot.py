@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.snapshot import check_snapshot, rebuild_snapshot
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the per-language home page snapshots, or checks them against the live tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--language",
+            action="append",
+            dest="languages",
+            help="Language code to process (repeatable). Defaults to every language.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare stored snapshots with the live tables; exit 1 if any differ.",
+        )
+
+    def handle(self, *args, **options):
+        languages = options["languages"] or [code for code, _label in settings.LANGUAGES]
+        if options["check"]:
+            stale = {language: check_snapshot(language) for language in languages}
+            for language, sections in stale.items():
+                if sections:
+                    self.stdout.write(
+                        self.style.WARNING(f"{language}: out of date ({', '.join(sections)})")
+                    )
+                else:
+                    self.stdout.write(f"{language}: up to date")
+            if any(stale.values()):
+                raise CommandError("Home snapshots differ from the live tables.")
+            return
+
+        for language in languages:
+            rebuild_snapshot(language)
+            self.stdout.write(f"Rebuilt {language} snapshot.")
+        self.stdout.write(self.style.SUCCESS("Home snapshots rebuilt."))
@@ -0,0 +1,42 @@
+"""Drain the auto-translation job queue outside the web workers.
+
+Usage:  python manage.py translate_worker            # run forever, polling
+        python manage.py translate_worker --once     # drain what is queued and exit
+
+Pair with TRANSLATION_WORKERS=0 to keep all translation traffic out of gunicorn.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from main.translation import memory_stats, process_jobs
+
+
+class Command(BaseCommand):
+    help = "Process queued EN->FR auto-translation jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue once, then exit.")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep between polls when the queue is empty (default: 5).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            succeeded, failed = process_jobs()
+            if succeeded or failed:
+                stats = memory_stats()
+                self.stdout.write(
+                    f"Translation jobs: {succeeded} done, {failed} failed "
+                    f"(memory: {stats['hits']} hits, {stats['misses']} misses)."
+                )
+            if options["once"]:
+                break
+            close_old_connections()
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS("Translation queue drained."))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from main.caching import warm_home_page, warmup_hosts
+
+
+class Command(BaseCommand):
+    help = "Pre-renders the home page in every language so no visitor gets a cold cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--host",
+            action="append",
+            dest="hosts",
+            help="Host to render for (repeatable). Defaults to the concrete ALLOWED_HOSTS.",
+        )
+        parser.add_argument(
+            "--scheme",
+            choices=("http", "https"),
+            help="Scheme visitors use. Defaults to https when SECURE_SSL_REDIRECT is on.",
+        )
+
+    def handle(self, *args, **options):
+        secure = None if options["scheme"] is None else options["scheme"] == "https"
+        failed = 0
+        for url, status in warm_home_page(options["hosts"] or warmup_hosts(), secure=secure):
+            if status == 200:
+                self.stdout.write(f"Warmed {url}")
+            else:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"{url} returned {status}"))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} page(s) could not be warmed."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Home page cache is warm."))
@@ -0,0 +1,191 @@
+"""Production serving of uploaded media.
+
+Replaces ``django.views.static.serve``, which reads files through Python in
+8 KB blocks, ignores Range headers and sends no Cache-Control. Here:
+
+* Files go out as a FileResponse, which gunicorn hands to ``os.sendfile``, so a
+  download costs a worker thread almost no CPU.
+* Single byte-range requests get a 206 with just that slice, so browsers can
+  seek in the hero video without downloading it whole.
+* Names carrying a content hash (``photo.3f9a0c1b2d4e.jpg``, as written by
+  main.storage) never change content and are cached for a year as
+  ``immutable``; other names for MEDIA_CACHE_MAX_AGE seconds.
+* With ``MEDIA_SENDFILE`` set, the response is only headers and the front proxy
+  sends the file itself: ``x-accel-redirect`` for nginx (an ``internal``
+  location aliasing MEDIA_ROOT at MEDIA_ACCEL_REDIRECT_PREFIX) or
+  ``x-sendfile`` for Apache/lighttpd.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+from .storage import is_hashed_name
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+SENDFILE_BACKENDS = ("x-accel-redirect", "x-sendfile")
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def cache_control(name):
+    if is_hashed_name(name):
+        return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return f"public, max-age={getattr(settings, 'MEDIA_CACHE_MAX_AGE', 86400)}"
+
+
+def parse_range(header, size):
+    """``(start, end)`` inclusive for a single-range ``header``; None to send the whole file.
+
+    Raises ValueError when the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None  # absent, malformed, or multiple ranges: a 200 is always allowed
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes.
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range starts past the end of the file")
+    return start, end
+
+
+class _FileSlice:
+    """File object limited to ``length`` bytes from its current position.
+
+    FileResponse reads it block by block; gunicorn's sendfile path instead
+    uses ``fileno()`` from the current offset, bounded by Content-Length.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+        self.name = file.name
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        # Weak comparison (RFC 9110 13.1.2): proxies may hand back W/"..." tags.
+        tags = parse_etags(if_none_match)
+        return tags == ["*"] or etag.removeprefix("W/") in {t.removeprefix("W/") for t in tags}
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return since is not None and int(mtime) <= since
+
+
+def _range_applies(request, etag, mtime):
+    """Honour Range unless If-Range names a different version of the file."""
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/"')):
+        return if_range == etag and not etag.startswith("W/")
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def _content_type(fullpath):
+    return mimetypes.guess_type(fullpath)[0] or "application/octet-stream"
+
+
+def _sendfile_response(path, fullpath):
+    backend = getattr(settings, "MEDIA_SENDFILE", "")
+    if backend not in SENDFILE_BACKENDS:
+        # A proxy that does not know the header would send an empty body.
+        raise ImproperlyConfigured(
+            f"MEDIA_SENDFILE must be one of {', '.join(SENDFILE_BACKENDS)}, not {backend!r}."
+        )
+    response = HttpResponse(content_type=_content_type(fullpath))
+    if backend == "x-accel-redirect":
+        prefix = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/")
+        response["X-Accel-Redirect"] = quote(f"{prefix}/{path}")
+    else:
+        response["X-Sendfile"] = fullpath
+    return response
+
+
+def _file_response(request, fullpath, size, etag, mtime):
+    content_type = _content_type(fullpath)
+    byte_range = None
+    if _range_applies(request, etag, mtime):
+        try:
+            byte_range = parse_range(request.headers.get("Range"), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    start, end = byte_range or (0, size - 1)
+    length = max(0, end - start + 1)
+    if request.method == "HEAD":
+        response = HttpResponse(content_type=content_type, status=206 if byte_range else 200)
+    else:
+        file = open(fullpath, "rb")  # noqa: SIM115 - closed by the response
+        file.seek(start)
+        body = _FileSlice(file, length) if byte_range else file
+        response = FileResponse(body, content_type=content_type, status=206 if byte_range else 200)
+    response["Content-Length"] = str(length)
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Media not found") from None
+    try:
+        stat = os.stat(fullpath)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404("Media not found") from None
+    if not os.path.isfile(fullpath):
+        raise Http404("Media not found")
+
+    etag = quote_etag(f"{int(stat.st_mtime):x}-{stat.st_size:x}")
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Cache-Control": cache_control(path),
+        "Accept-Ranges": "bytes",
+    }
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+    elif getattr(settings, "MEDIA_SENDFILE", ""):
+        # The proxy handles Range and conditional requests from here on.
+        response = _sendfile_response(path, fullpath)
+    else:
+        response = _file_response(request, fullpath, stat.st_size, etag, stat.st_mtime)
+    for header, value in headers.items():
+        response.headers.setdefault(header, value)
+    return response
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_sitesettings_sitesettingstranslation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentStamp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+    ]
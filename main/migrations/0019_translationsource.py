@@ -0,0 +1,81 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:46
+
+import hashlib
+
+from django.db import migrations, models
+
+TRANSLATED_MODELS = (
+    "Profile",
+    "SiteSettings",
+    "Skill",
+    "Project",
+    "Experience",
+    "Education",
+    "Hobby",
+    "Recognition",
+    "Testimonial",
+)
+
+
+def _hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def record_existing_french(apps, schema_editor):
+    """Treat French that exists today as up to date with today's English."""
+    TranslationSource = apps.get_model("main", "TranslationSource")
+    sources = []
+    for name in TRANSLATED_MODELS:
+        Translation = apps.get_model("main", f"{name}Translation")
+        fields = [
+            f.name
+            for f in Translation._meta.concrete_fields
+            if f.name not in ("id", "language_code", "master")
+        ]
+        rows = {}
+        for row in Translation.objects.filter(language_code__in=("en", "fr")):
+            rows[(row.master_id, row.language_code)] = row
+        for (master_id, language), en in rows.items():
+            if language != "en":
+                continue
+            fr = rows.get((master_id, "fr"))
+            for field in fields:
+                text = getattr(en, field)
+                if not text or not isinstance(text, str):
+                    continue
+                current = _hash(text)
+                sources.append(
+                    TranslationSource(
+                        model_label=f"main.{name.lower()}",
+                        object_id=master_id,
+                        field=field,
+                        current_hash=current,
+                        source_hash=current if fr is not None and getattr(fr, field) else "",
+                    )
+                )
+    TranslationSource.objects.bulk_create(sources, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0018_translationmemory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(help_text='e.g. "main.project".', max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('field', models.CharField(max_length=100)),
+                ('current_hash', models.CharField(blank=True, max_length=64)),
+                ('source_hash', models.CharField(blank=True, max_length=64)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('model_label', 'object_id', 'field'), name='unique_translation_source')],
+            },
+        ),
+        migrations.RunPython(record_existing_french, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:40
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0019_translationsource'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HomeSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language_code', models.CharField(max_length=15, unique=True)),
+                ('content_version', models.CharField(max_length=64)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0020_homesnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['category', 'order'], name='main_skill_categor_1d52ee_idx'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 6.0.1 on 2026-10-18 21:10
+
+from django.db import migrations
+
+# Full-text indexes for the ContactMessage admin search (see main.search).
+# Vendor-specific, so each step is a no-op on other databases. A later
+# migration that makes SQLite rebuild main_contactmessage drops the triggers
+# along with the old table; such a migration must recreate them.
+PG_CREATE = """
+CREATE INDEX IF NOT EXISTS main_contactmessage_search ON main_contactmessage USING gin (
+    (to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(email, '')
+     || ' ' || coalesce(subject, '') || ' ' || coalesce(message, '')))
+)
+"""
+PG_DROP = "DROP INDEX IF EXISTS main_contactmessage_search"
+
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE main_contactmessage_fts USING fts5(
+        name, email, subject, message, content='main_contactmessage', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER main_contactmessage_fts_insert AFTER INSERT ON main_contactmessage BEGIN
+        INSERT INTO main_contactmessage_fts(rowid, name, email, subject, message)
+        VALUES (new.id, new.name, new.email, new.subject, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER main_contactmessage_fts_delete AFTER DELETE ON main_contactmessage BEGIN
+        INSERT INTO main_contactmessage_fts(main_contactmessage_fts, rowid, name, email, subject, message)
+        VALUES ('delete', old.id, old.name, old.email, old.subject, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER main_contactmessage_fts_update AFTER UPDATE ON main_contactmessage BEGIN
+        INSERT INTO main_contactmessage_fts(main_contactmessage_fts, rowid, name, email, subject, message)
+        VALUES ('delete', old.id, old.name, old.email, old.subject, old.message);
+        INSERT INTO main_contactmessage_fts(rowid, name, email, subject, message)
+        VALUES (new.id, new.name, new.email, new.subject, new.message);
+    END
+    """,
+    "INSERT INTO main_contactmessage_fts(main_contactmessage_fts) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS main_contactmessage_fts_insert",
+    "DROP TRIGGER IF EXISTS main_contactmessage_fts_delete",
+    "DROP TRIGGER IF EXISTS main_contactmessage_fts_update",
+    "DROP TABLE IF EXISTS main_contactmessage_fts",
+]
+
+
+def _sqlite_has_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(PG_CREATE)
+    elif vendor == "sqlite" and _sqlite_has_fts5(schema_editor):
+        for statement in SQLITE_CREATE:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(PG_DROP)
+    elif vendor == "sqlite":
+        for statement in SQLITE_DROP:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0022_imagejob"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0023_contactmessage_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='skill',
+            name='category',
+            field=models.CharField(choices=[('LANGUAGES', 'Languages'), ('FRAMEWORKS', 'Frameworks'), ('INFRA', 'Infrastructure'), ('AI_ML', 'AI / ML'), ('OTHER', 'Other')], default='OTHER', help_text='Group this skill renders under.', max_length=20),
+        ),
+    ]
@@ -1,63 +1,25 @@
 import contextlib
-import logging
-import sys
-import threading
+import copy
+import time
+from collections import defaultdict
 
-from deep_translator import GoogleTranslator
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import prefetch_related_objects
+from django.utils.translation import get_language
 from parler.models import TranslatableModel, TranslatedFields
 
-logger = logging.getLogger(__name__)
-
-# Background threads racing SQLite during tests cause "database is locked"
-# errors. Skip scheduling when running the test suite.
-_RUNNING_TESTS = "test" in sys.argv or getattr(settings, "TESTING", False)
-
-
-def _do_auto_translate(instance):
-    """
-    Core EN->FR translation. Runs off the request thread — NEVER call from save().
-    Only triggers when current language is EN and FR translation is missing.
-    """
-    try:
-        if instance.get_current_language() != "en":
-            return
-        if instance.has_translation("fr"):
-            return
-
-        translator = GoogleTranslator(source="en", target="fr")
-        en_trans = instance.get_translation("en")
-
-        instance.set_current_language("fr")
-        for field in instance._parler_meta.get_translated_fields():
-            value = getattr(en_trans, field, None)
-            if value and isinstance(value, str):
-                try:
-                    translated_value = translator.translate(value)
-                    setattr(instance, field, translated_value)
-                except Exception:
-                    logger.exception("Translation failed for field %s", field)
-        # Persist the FR translation without triggering the auto-translate loop again
-        # (guarded by has_translation("fr") above on re-entry).
-        try:
-            instance.save_translations()
-        except Exception:
-            logger.exception("save_translations failed on %s", instance)
-        instance.set_current_language("en")
-    except Exception:
-        logger.exception("Auto-translation error")
-        with contextlib.suppress(Exception):
-            instance.set_current_language("en")
-
-
-def schedule_auto_translate(instance):
-    """Fire-and-forget background translation so form.save() returns immediately."""
-    if _RUNNING_TESTS:
-        return
-    t = threading.Thread(target=_do_auto_translate, args=(instance,), daemon=True)
-    t.start()
+# Per-process memo of SingletonModel.load() results: {cls: (versions, obj)}.
+# The version stamp lives in the shared cache and is bumped from main.signals on
+# save/delete, so every worker drops its memo on the next load() after an edit.
+# With LocMemCache that stamp is per-process, so the memo is also tied to the
+# home content version (main.caching), which every worker re-reads from the
+# database: a page cached under a new content version is never rendered from a
+# singleton memoized before it.
+_SINGLETON_MEMO = {}
 
 
 # Singleton Model Mixin
@@ -70,9 +32,67 @@ class SingletonModel(models.Model):
             raise ValidationError(f"There can be only one {self.__class__.__name__} instance")
         return super().save(*args, **kwargs)
 
+    @classmethod
+    def load_version_key(cls):
+        return f"singleton:{cls._meta.label_lower}:version"
+
     @classmethod
     def load(cls):
-        obj, created = cls.objects.get_or_create(pk=1)
+        """Return the singleton row, memoized per process while its versions are unchanged.
+
+        Steady state costs two cache reads and no queries. Each call gets its own
+        shallow copy bound to the active language, so callers never share state.
+        """
+        key = cls.load_version_key()
+        version = cache.get(key)
+        if version is None:
+            # Seed with a fresh value rather than 1 so a cache eviction can never
+            # make a memo taken before the last bump look current again.
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        # main.caching imports this module.
+        from .caching import get_content_version
+
+        versions = (version, get_content_version())
+
+        memo = _SINGLETON_MEMO.get(cls)
+        if memo is None or memo[0] != versions:
+            obj = cls._load_from_db()
+            if isinstance(obj, TranslatableModel):
+                # Every language then resolves locally — no per-request queries.
+                prefetch_related_objects([obj], "translations")
+                obj._read_prefetched_translations()
+            memo = (versions, obj)
+            _SINGLETON_MEMO[cls] = memo
+        return memo[1]._memo_copy()
+
+    @classmethod
+    def invalidate_load_cache(cls):
+        """Drop this process's memo and bump the shared version stamp."""
+        _SINGLETON_MEMO.pop(cls, None)
+        # A missing key is fine — the next load() seeds a fresh version.
+        with contextlib.suppress(ValueError):
+            cache.incr(cls.load_version_key())
+
+    def _memo_copy(self):
+        clone = copy.copy(self)
+        if isinstance(self, TranslatableModel):
+            clone._translations_cache = defaultdict(
+                dict,
+                {
+                    model: {
+                        lang: copy.copy(t) if isinstance(t, models.Model) else t
+                        for lang, t in langs.items()
+                    }
+                    for model, langs in self._translations_cache.items()
+                },
+            )
+            clone.set_current_language(get_language() or settings.LANGUAGE_CODE)
+        return clone
+
+    @classmethod
+    def _load_from_db(cls):
+        obj, created = cls.objects.prefetch_related("translations").get_or_create(pk=1)
         if not obj.has_translation("en"):
             obj.set_current_language("en")
             obj.name = "Your Name"
@@ -156,8 +176,8 @@ class SiteSettings(SingletonModel, TranslatableModel):
         verbose_name_plural = "Site Settings"
 
     @classmethod
-    def load(cls):
-        obj, _created = cls.objects.get_or_create(pk=1)
+    def _load_from_db(cls):
+        obj, _created = cls.objects.prefetch_related("translations").get_or_create(pk=1)
         if not obj.has_translation("en"):
             obj.set_current_language("en")
             obj.availability_text = "Available for Summer 2026 internships"
@@ -189,7 +209,7 @@ class ContactInfo(SingletonModel):
     twitter_url = models.URLField(blank=True)
 
     @classmethod
-    def load(cls):
+    def _load_from_db(cls):
         obj, created = cls.objects.get_or_create(pk=1, defaults={"email": "contact@example.com"})
         if not obj.email:
             obj.email = "contact@example.com"
@@ -200,6 +220,20 @@ class ContactInfo(SingletonModel):
         return "Contact Details"
 
 
+class ContentStamp(models.Model):
+    """Single row recording when home-page content last changed.
+
+    Bumped from main.signals on every content save/delete and read through the
+    cache, so ETag/Last-Modified never require scanning the content tables.
+    """
+
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Content v{self.version} ({self.updated_at:%Y-%m-%d %H:%M})"
+
+
 class Skill(TranslatableModel):
     CATEGORY_CHOICES = [
         ("LANGUAGES", "Languages"),
@@ -216,7 +250,6 @@ class Skill(TranslatableModel):
         max_length=20,
         choices=CATEGORY_CHOICES,
         default="OTHER",
-        db_index=True,
         help_text="Group this skill renders under.",
     )
     order = models.IntegerField(
@@ -233,6 +266,9 @@ class Skill(TranslatableModel):
 
     class Meta:
         ordering = ["category", "order"]
+        # Serves the grouped, ordered scan the home page snapshot is built from,
+        # and, through its leading column, any lookup by category.
+        indexes = [models.Index(fields=["category", "order"])]
 
     def __str__(self):
         return self.safe_translation_getter("name", any_language=True)
@@ -480,3 +516,148 @@ class Testimonial(TranslatableModel):
 
     def __str__(self):
         return f"Testimonial from {self.name}"
+
+
+class TranslationJob(models.Model):
+    """A queued EN->FR auto-translation for one translatable row.
+
+    At most one job exists per (model, object), so repeated saves of the same
+    row collapse into a single job. Jobs are deleted once done; those that keep
+    failing are left as FAILED for inspection.
+    """
+
+    STATUS_PENDING = "PENDING"
+    STATUS_RUNNING = "RUNNING"
+    STATUS_FAILED = "FAILED"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    model_label = models.CharField(max_length=100, help_text='e.g. "main.project".')
+    object_id = models.PositiveBigIntegerField()
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model_label", "object_id"], name="unique_translation_job"
+            )
+        ]
+
+    def __str__(self):
+        return f"Translate {self.model_label}#{self.object_id} ({self.status})"
+
+
+class TranslationMemory(models.Model):
+    """A remembered machine translation of one exact source string.
+
+    Keyed by a hash of (language pair, text), so identical strings are only
+    ever sent to the translator once — across rows, models, and re-runs.
+    """
+
+    source_hash = models.CharField(max_length=64, unique=True)
+    source_language = models.CharField(max_length=15)
+    target_language = models.CharField(max_length=15)
+    source_text = models.TextField()
+    translated_text = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Translation memory"
+
+    def __str__(self):
+        return f"{self.source_language}->{self.target_language}: {self.source_text[:40]}"
+
+
+class TranslationSource(models.Model):
+    """Which EN text one translated field's French was produced from.
+
+    ``current_hash`` follows the EN text as it is saved; ``source_hash`` is the
+    EN text the French currently reflects. A field whose hashes differ has
+    stale French and is the only part of the row re-translated.
+    """
+
+    model_label = models.CharField(max_length=100, help_text='e.g. "main.project".')
+    object_id = models.PositiveBigIntegerField()
+    field = models.CharField(max_length=100)
+    current_hash = models.CharField(max_length=64, blank=True)
+    source_hash = models.CharField(max_length=64, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model_label", "object_id", "field"], name="unique_translation_source"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.model_label}#{self.object_id}.{self.field}"
+
+    @property
+    def is_stale(self):
+        return bool(self.current_hash) and self.source_hash != self.current_hash
+
+
+class HomeSnapshot(models.Model):
+    """Every home page content section for one language, denormalized to JSON.
+
+    Built by main.snapshot from the live tables and tagged with the content
+    version it reflects; a snapshot whose version is not current is rebuilt.
+    """
+
+    language_code = models.CharField(max_length=15, unique=True)
+    content_version = models.CharField(max_length=64)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Home snapshot ({self.language_code}, v{self.content_version})"
+
+
+class ImageJob(models.Model):
+    """Resized derivatives to build for one uploaded image (see main.images).
+
+    One job per original file. The worker records the file's content hash,
+    and DONE jobs are kept as an index of it: a later upload with the same
+    bytes copies their derivatives instead of re-encoding.
+    """
+
+    STATUS_PENDING = "PENDING"
+    STATUS_RUNNING = "RUNNING"
+    STATUS_DONE = "DONE"
+    STATUS_FAILED = "FAILED"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=255, unique=True, help_text="Storage name of the original.")
+    model_label = models.CharField(max_length=100, help_text='e.g. "main.project".')
+    field = models.CharField(max_length=100)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"Derivatives of {self.name} ({self.status})"
@@ -0,0 +1,134 @@
+"""Admin changelist paging for tables too large to COUNT or OFFSET through.
+
+``EstimatedCountPaginator`` uses PostgreSQL's planner estimate once a result
+is large enough that an exact ``COUNT(*)`` would cost more than the page.
+``KeysetChangeList`` pages through the default newest-first ordering with a
+``?before=<created_at>,<pk>`` cursor, so every page is an index range scan on
+``created_at`` however deep the admin goes, and only a filtered list pays for
+counting its matches; a sorted column falls back to numbered pages.
+"""
+
+import json
+
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+# Below this many estimated rows an exact count is cheap enough to run.
+ESTIMATE_THRESHOLD = 10_000
+
+CURSOR_VAR = "before"
+
+
+def estimate_count(queryset):
+    """The planner's row estimate for ``queryset`` on PostgreSQL, None elsewhere."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Counts exactly up to ESTIMATE_THRESHOLD rows, estimates beyond it."""
+
+    estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate > ESTIMATE_THRESHOLD:
+            self.estimated = True
+            return estimate
+        return super().count
+
+
+def format_cursor(obj, field):
+    return f"{getattr(obj, field).isoformat()},{obj.pk}"
+
+
+def parse_cursor(value):
+    """``(datetime, pk)`` from a cursor string, or None if it is malformed."""
+    value, _, pk = (value or "").rpartition(",")
+    try:
+        when = parse_datetime(value)
+        pk = int(pk)
+    except ValueError:
+        return None
+    return (when, pk) if when else None
+
+
+class KeysetChangeList(ChangeList):
+    """ChangeList that pages newest-first by cursor instead of by OFFSET.
+
+    Only the page shown is narrowed by the cursor: ``queryset`` (and so the
+    result count and "select all" actions) still covers every matching row.
+    """
+
+    keyset_field = "created_at"
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = parse_cursor(request.GET.get(CURSOR_VAR))
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Filter, search and sort links start again from the newest row.
+        return super().get_query_string(new_params, [*(remove or ()), CURSOR_VAR])
+
+    def get_results(self, request):
+        self.keyset = ORDER_VAR not in self.params and not self.show_all
+        if not self.keyset:
+            return super().get_results(request)
+
+        page = self.queryset.order_by(f"-{self.keyset_field}", "-pk")
+        if self.cursor:
+            when, pk = self.cursor
+            page = page.filter(
+                Q(**{f"{self.keyset_field}__lt": when})
+                | Q(**{self.keyset_field: when, "pk__lt": pk})
+            )
+        rows = list(page[: self.list_per_page + 1])
+        self.result_list = rows[: self.list_per_page]
+        self.older_url = None
+        if len(rows) > self.list_per_page:
+            last = self.result_list[-1]
+            self.older_url = self.get_query_string(
+                {CURSOR_VAR: format_cursor(last, self.keyset_field)}
+            )
+        self.newest_url = self.get_query_string() if self.cursor else None
+
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.keyset_result_count(request)
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.full_result_count = self.root_queryset.count() if self.show_full_result_count else None
+        self.show_admin_actions = not self.show_full_result_count or bool(self.full_result_count)
+        self.can_show_all = False
+        self.multi_page = bool(self.older_url or self.newest_url)
+
+    def keyset_result_count(self, request):
+        """How many rows match, without a COUNT(*) wherever the answer is known.
+
+        A first page that holds every match counts itself. An unfiltered list
+        uses the model admin's ``cached_result_count(request)``, if it has one.
+        Only the rest fall back to the paginator (a planner estimate on
+        PostgreSQL, an exact count elsewhere).
+        """
+        if not self.cursor and not self.older_url:
+            return len(self.result_list)
+        cached = getattr(self.model_admin, "cached_result_count", None)
+        if cached is not None and not self.queryset.query.where:
+            return cached(request)
+        return self.paginator.count
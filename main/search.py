@@ -0,0 +1,72 @@
+"""Full-text search over contact messages, for the admin changelist.
+
+The admin's default search turns every term into ``ILIKE '%term%'`` on each
+search field, which scans the whole table. Migration 0023 indexes the same
+four fields for full-text search instead: an expression GIN index on
+PostgreSQL and an external-content FTS5 table, kept current by triggers, on
+SQLite. Matching is by word prefix ("viag" finds "viagra"), AND across words.
+On databases without either index the admin keeps its default search.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+# Must stay identical to the indexed expression in migration 0023, or
+# PostgreSQL will not use the index.
+PG_DOCUMENT = (
+    "to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(email, '')"
+    " || ' ' || coalesce(subject, '') || ' ' || coalesce(message, ''))"
+)
+PG_INDEX = "main_contactmessage_search"
+SQLITE_TABLE = "main_contactmessage_fts"
+
+_TERM_RE = re.compile(r"[\w@.+-]+")
+
+_available = {}
+
+
+def search_terms(query):
+    """The words of ``query``, without the punctuation full-text syntax would choke on."""
+    return [term.strip(".+-@") for term in _TERM_RE.findall(query) if term.strip(".+-@")]
+
+
+def full_text_available(alias="default"):
+    """Whether migration 0023 created a full-text index on database ``alias``."""
+    if alias not in _available:
+        connection = connections[alias]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_indexes WHERE indexname = %s", [PG_INDEX])
+                _available[alias] = cursor.fetchone() is not None
+        elif connection.vendor == "sqlite":
+            _available[alias] = SQLITE_TABLE in connection.introspection.table_names()
+        else:
+            _available[alias] = False
+    return _available[alias]
+
+
+def full_text_filter(queryset, query):
+    """``queryset`` narrowed to messages matching every word of ``query``, or None.
+
+    None means the database has no full-text index (or ``query`` has no
+    words), and the caller should fall back to its default search.
+    """
+    terms = search_terms(query)
+    if not terms or not full_text_available(queryset.db):
+        return None
+    if connections[queryset.db].vendor == "postgresql":
+        tsquery = " & ".join("'{}':*".format(term.replace("'", "''")) for term in terms)
+        return queryset.filter(
+            RawSQL(
+                f"{PG_DOCUMENT} @@ to_tsquery('simple'::regconfig, %s)",
+                [tsquery],
+                output_field=BooleanField(),
+            )
+        )
+    match = " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+    return queryset.filter(
+        pk__in=RawSQL(f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s", [match])
+    )
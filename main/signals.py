@@ -1,36 +1,29 @@
-from django.core.cache import cache
-from django.core.cache.utils import make_template_fragment_key
-from django.db.models.signals import post_delete, post_save
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from .caching import invalidate_model
+from .counters import adjust_count
+from .images import DERIVED_FIELDS, enqueue_derivatives
 from .models import (
+    ContactInfo,
     ContactMessage,
     Education,
     Experience,
+    HeroSlide,
     Hobby,
     Profile,
     Project,
     Recognition,
     SiteSettings,
     Skill,
+    TechTag,
     Testimonial,
-    schedule_auto_translate,
-)
-
-# Fragment-cache fragment names — kept in sync with {% cache N "name" LANGUAGE_CODE %}
-# blocks in home.html. Each {% cache %} block varies on LANGUAGE_CODE, so the real
-# cache key is derived per language via make_template_fragment_key().
-HOME_FRAGMENT_NAMES = (
-    "home.skills",
-    "home.recognitions",
-    "home.projects",
-    "home.career",
-    "home.hobbies",
-    "home.testimonials",
 )
-
-# Languages the {% cache %} blocks can be rendered under.
-_LANGUAGES = ("en", "fr")
+from .storage import delete_orphaned_files, file_fields
+from .translation import enqueue_translation, record_english, record_french
 
 TRANSLATABLE_MODELS = (
     Profile,
@@ -45,46 +38,155 @@ TRANSLATABLE_MODELS = (
 )
 
 
-# ─── Background auto-translate on every translatable save ────────
+# ─── Queue auto-translation when EN text outdates the French ─────
 def _schedule_translate(sender, instance, created, **kwargs):
-    schedule_auto_translate(instance)
+    """Fires for the translation row, i.e. only once parler has written the text."""
+    if instance.language_code == "en":
+        if record_english(instance):
+            enqueue_translation(instance.master)
+    elif instance.language_code == "fr":
+        record_french(instance)
 
 
 for _model in TRANSLATABLE_MODELS:
-    post_save.connect(_schedule_translate, sender=_model, weak=False)
+    post_save.connect(_schedule_translate, sender=_model._parler_meta.root_model, weak=False)
+
+
+# ─── Singleton load() memo invalidation ──────────────────────────
+SINGLETON_MODELS = (Profile, SiteSettings, ContactInfo)
+
+
+def _invalidate_singleton(sender, **kwargs):
+    """Bump the load() version of the singleton a saved/deleted row belongs to.
+
+    Fires for both the master model and its parler translation model, since
+    admin edits to translated fields only save the translation row. The bump is
+    repeated on commit so no worker can re-memoize pre-commit data.
+    """
+    singleton = _SINGLETON_SENDERS[sender]
+    singleton.invalidate_load_cache()
+    transaction.on_commit(singleton.invalidate_load_cache)
+
+
+_SINGLETON_SENDERS = {}
+for _model in SINGLETON_MODELS:
+    _SINGLETON_SENDERS[_model] = _model
+    if hasattr(_model, "_parler_meta"):
+        _SINGLETON_SENDERS[_model._parler_meta.root_model] = _model
+
+# The cached slideshow listing (main.images.slideshow_sources) is keyed by the
+# Profile's version.
+_SINGLETON_SENDERS[HeroSlide] = Profile
+
+for _sender in _SINGLETON_SENDERS:
+    post_save.connect(_invalidate_singleton, sender=_sender, weak=False)
+    post_delete.connect(_invalidate_singleton, sender=_sender, weak=False)
 
 
 # ─── Fragment cache invalidation on content changes ──────────────
 def _invalidate_home_fragments(sender, **kwargs):
-    """Delete every per-language {% cache %} fragment on the home page.
+    """Retire the fragments ``sender`` renders into, plus every cached page.
 
-    {% cache %} keys are hashed by Django (make_template_fragment_key), so the
-    raw fragment name never matches the stored key. We must reconstruct the key
-    for each (fragment name, language) pair — a plain delete_many of the names
-    silently does nothing.
+    Fires for parler translation models too, so French written by the
+    translation queue shows up without a master save.
     """
-    keys = [
-        make_template_fragment_key(name, [lang])
-        for name in HOME_FRAGMENT_NAMES
-        for lang in _LANGUAGES
+    invalidate_model(_CONTENT_SENDERS.get(sender, sender))
+
+
+# Non-translatable models that still render on the home page.
+HOME_CONTENT_MODELS = TRANSLATABLE_MODELS + (ContactInfo, HeroSlide, TechTag)
+
+_CONTENT_SENDERS = {}
+for _model in HOME_CONTENT_MODELS:
+    _CONTENT_SENDERS[_model] = _model
+    if hasattr(_model, "_parler_meta"):
+        _CONTENT_SENDERS[_model._parler_meta.root_model] = _model
+
+for _sender in _CONTENT_SENDERS:
+    post_save.connect(_invalidate_home_fragments, sender=_sender, weak=False)
+    post_delete.connect(_invalidate_home_fragments, sender=_sender, weak=False)
+
+
+# ─── Responsive image derivatives ────────────────────────────────
+def _queue_image_derivatives(sender, instance, **kwargs):
+    """Queue derivatives for new uploads; main.images builds them off the request."""
+    enqueue_derivatives(instance)
+
+
+for _model in {model for model, _field in DERIVED_FIELDS}:
+    post_save.connect(_queue_image_derivatives, sender=_model, weak=False)
+
+
+# ─── Orphaned upload cleanup ─────────────────────────────────────
+# Uploads are content-addressed and may be shared between rows (main.storage),
+# so a replaced or deleted file is only removed once nothing references it.
+_FILE_FIELDS = defaultdict(list)
+for _model, _field_name in file_fields():
+    _FILE_FIELDS[_model].append(_field_name)
+
+
+def _remember_stored_files(sender, instance, **kwargs):
+    instance._stored_files = {}
+    if instance.pk is not None:
+        instance._stored_files = (
+            sender._base_manager.filter(pk=instance.pk).values(*_FILE_FIELDS[sender]).first() or {}
+        )
+
+
+def _delete_replaced_files(sender, instance, **kwargs):
+    stored = getattr(instance, "_stored_files", {})
+    replaced = [
+        name
+        for field_name, name in stored.items()
+        if name and name != getattr(instance, field_name).name
     ]
-    cache.delete_many(keys)
+    if replaced:
+        transaction.on_commit(lambda: delete_orphaned_files(replaced))
 
 
-for _model in TRANSLATABLE_MODELS:
-    post_save.connect(_invalidate_home_fragments, sender=_model, weak=False)
-    post_delete.connect(_invalidate_home_fragments, sender=_model, weak=False)
+def _delete_removed_files(sender, instance, **kwargs):
+    names = [getattr(instance, field_name).name for field_name in _FILE_FIELDS[sender]]
+    transaction.on_commit(lambda: delete_orphaned_files(names))
 
 
+for _model in _FILE_FIELDS:
+    pre_save.connect(_remember_stored_files, sender=_model, weak=False)
+    post_save.connect(_delete_replaced_files, sender=_model, weak=False)
+    post_delete.connect(_delete_removed_files, sender=_model, weak=False)
+
+
+# ─── Admin badge counters ────────────────────────────────────────
+# New messages and testimonials are surfaced through the admin badges only
+# (email notifications are disabled); keep their cached counts current.
 @receiver(post_save, sender=ContactMessage)
-def notify_new_message(sender, instance, created, **kwargs):
-    """Placeholder — email notifications disabled; surfaced via admin only."""
+def count_new_message(sender, instance, created, **kwargs):
     if created:
-        return
+        adjust_count("messages", 1)
+
+
+@receiver(post_delete, sender=ContactMessage)
+def count_deleted_message(sender, instance, **kwargs):
+    adjust_count("messages", -1)
+
+
+@receiver(pre_save, sender=Testimonial)
+def _remember_approval(sender, instance, **kwargs):
+    instance._was_approved = None
+    if instance.pk is not None:
+        instance._was_approved = (
+            sender._base_manager.filter(pk=instance.pk)
+            .values_list("is_approved", flat=True)
+            .first()
+        )
 
 
 @receiver(post_save, sender=Testimonial)
-def notify_new_testimonial(sender, instance, created, **kwargs):
-    """Placeholder — email notifications disabled; surfaced via admin only."""
-    if created:
-        return
+def count_pending_testimonial(sender, instance, created, **kwargs):
+    was_pending = getattr(instance, "_was_approved", None) is False
+    adjust_count("pending_testimonials", int(not instance.is_approved) - int(was_pending))
+
+
+@receiver(post_delete, sender=Testimonial)
+def count_deleted_testimonial(sender, instance, **kwargs):
+    if not instance.is_approved:
+        adjust_count("pending_testimonials", -1)
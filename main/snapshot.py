@@ -0,0 +1,182 @@
+"""Materialized home page content: one JSON document per language.
+
+Rendering the home page cold means joining about a dozen tables. Instead, the
+sections produced by main.content are serialized into a HomeSnapshot row per
+language, and the view reads back a single cache key (or, on a cache miss, a
+single row). Each snapshot is tagged with the content version it was built
+from. A content change only bumps that version; the first read after it (with
+HOME_CACHE_WARMUP, the background warm-up) rebuilds the snapshot, so saves
+never pay for a rebuild and a stale snapshot is never served.
+"""
+
+import datetime
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.fields.files import FieldFile
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import get_language
+
+from .caching import PAGE_CACHE_TIMEOUT, get_content_version
+from .content import (
+    Record,
+    load_educations,
+    load_experiences,
+    load_hobbies,
+    load_projects,
+    load_recognitions,
+    load_skills,
+    load_testimonials,
+)
+from .models import Hobby, HomeSnapshot, Project
+
+SECTIONS = {
+    "skill_groups": load_skills,
+    "projects": load_projects,
+    "experiences": load_experiences,
+    "educations": load_educations,
+    "recognitions": load_recognitions,
+    "hobbies": load_hobbies,
+    "testimonials": load_testimonials,
+}
+
+# Values JSON flattens that records must get back in their original type.
+_DATE_FIELDS = {
+    "projects": ("created_date",),
+    "experiences": ("start_date", "end_date"),
+    "educations": ("start_date", "end_date"),
+}
+_DATETIME_FIELDS = {"testimonials": ("created_at",)}
+_FILE_FIELDS = {"projects": (Project, "image"), "hobbies": (Hobby, "icon")}
+
+
+def _snapshot_key(version, language):
+    return f"home:snapshot:{version}:{language}"
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        value = vars(value)
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, FieldFile):
+        return value.name or ""
+    return value
+
+
+def _group_skills(skills):
+    groups = []
+    for skill in skills:
+        if not groups or groups[-1]["category"] != skill.category:
+            groups.append(
+                {"category": skill.category, "grouper": skill.get_category_display, "list": []}
+            )
+        groups[-1]["list"].append(skill)
+    return groups
+
+
+def build_snapshot_data(language):
+    """Load every section from the live tables, as JSON-ready data."""
+    data = {}
+    for section, loader in SECTIONS.items():
+        records = loader(language)
+        if section == "skill_groups":
+            records = _group_skills(records)
+        data[section] = _plain(records)
+    data["skill_count"] = sum(len(group["list"]) for group in data["skill_groups"])
+    # Round-trip so fresh and stored snapshots compare (and read back) identically.
+    return json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+
+
+def rebuild_snapshot(language, version=None):
+    """Rebuild and store the snapshot for ``language``; returns its data."""
+    # Read the version first: content saved meanwhile at worst makes the
+    # snapshot newer than its tag, never older.
+    version = version or get_content_version()
+    data = build_snapshot_data(language)
+    HomeSnapshot.objects.update_or_create(
+        language_code=language, defaults={"content_version": version, "data": data}
+    )
+    cache.set(_snapshot_key(version, language), data, PAGE_CACHE_TIMEOUT)
+    return data
+
+
+def rebuild_all_snapshots():
+    for language, _label in settings.LANGUAGES:
+        rebuild_snapshot(language)
+
+
+def get_snapshot(language):
+    """Current snapshot data for ``language``: one cache read, else one row."""
+    version = get_content_version()
+    key = _snapshot_key(version, language)
+    data = cache.get(key)
+    if data is None:
+        row = HomeSnapshot.objects.filter(language_code=language, content_version=version).first()
+        if row is None:
+            return rebuild_snapshot(language, version)
+        data = row.data
+        cache.set(key, data, PAGE_CACHE_TIMEOUT)
+    return data
+
+
+def check_snapshot(language):
+    """Return the sections whose stored snapshot differs from the live tables."""
+    row = HomeSnapshot.objects.filter(language_code=language).first()
+    live = build_snapshot_data(language)
+    if row is None:
+        return list(SECTIONS)
+    return [section for section in SECTIONS if row.data.get(section) != live[section]]
+
+
+def _record(data, section=None):
+    record = Record(**data)
+    for name in _DATE_FIELDS.get(section, ()):
+        if value := data.get(name):
+            setattr(record, name, datetime.date.fromisoformat(value))
+    for name in _DATETIME_FIELDS.get(section, ()):
+        if value := data.get(name):
+            setattr(record, name, datetime.datetime.fromisoformat(value))
+    if section in _FILE_FIELDS:
+        model, name = _FILE_FIELDS[section]
+        field = model._meta.get_field(name)
+        setattr(record, name, field.attr_class(None, field, data[name]))
+    for name in ("tech_tags", "tech_used"):
+        if name in data:
+            setattr(record, name, [Record(**tag) for tag in data[name]])
+    return record
+
+
+def _section_records(snapshot, section):
+    if section == "skill_groups":
+        return [
+            Record(
+                category=group["category"],
+                grouper=group["grouper"],
+                list=[_record(skill) for skill in group["list"]],
+            )
+            for group in snapshot[section]
+        ]
+    return [_record(item, section) for item in snapshot[section]]
+
+
+def snapshot_content(language=None):
+    """Context entries for every content section, read from the snapshot on first use."""
+    language = language or get_language()
+    snapshot = SimpleLazyObject(lambda: get_snapshot(language))
+    context = {
+        section: SimpleLazyObject(lambda section=section: _section_records(snapshot, section))
+        for section in SECTIONS
+    }
+    context["skill_count"] = SimpleLazyObject(lambda: snapshot["skill_count"])
+    # For markup outside the {% cache %} fragments: sizes without building records.
+    for section in SECTIONS:
+        if section != "skill_groups":
+            context[f"{section}_count"] = SimpleLazyObject(
+                lambda section=section: len(snapshot[section])
+            )
+    return context
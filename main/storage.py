@@ -0,0 +1,106 @@
+"""Content-addressed storage for uploads, and cleanup of files nothing uses.
+
+HashedFileSystemStorage stores ``projects/foo.jpg`` as
+``projects/foo.<first 12 hex digits of its SHA-256>.jpg``. A name therefore
+always refers to the same bytes, which is what lets main.media serve media as
+``immutable`` for a year, and saving identical content again just returns the
+existing name. Since one file can back several rows, a replaced or deleted
+upload is only removed once no file field references it any more (see
+``delete_orphaned_files``, called from main.signals after commit).
+"""
+
+import hashlib
+import logging
+import posixpath
+import re
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+
+logger = logging.getLogger(__name__)
+
+HASH_LENGTH = 12
+
+# Exactly what HashedFileSystemStorage writes: the hash right before the
+# (last) extension. Legacy names with a hex-looking run elsewhere, such as
+# "scan.20240101123456.pdf", must not be mistaken for content-addressed ones.
+HASHED_NAME_RE = re.compile(rf"\.[0-9a-f]{{{HASH_LENGTH}}}(?:\.[^.]+)?$")
+
+_HASH_SUFFIX_RE = re.compile(rf"\.[0-9a-f]{{{HASH_LENGTH}}}$")
+
+
+def is_hashed_name(name):
+    return bool(HASHED_NAME_RE.search(posixpath.basename(name)))
+
+
+class HashedFileSystemStorage(FileSystemStorage):
+    """FileSystemStorage that names every file after its content."""
+
+    def hashed_name(self, name, content, max_length=None):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        directory, filename = posixpath.split(name)
+        stem, ext = posixpath.splitext(filename)
+        # Re-saving a hashed file must not stack a second hash onto the name.
+        stem = _HASH_SUFFIX_RE.sub("", stem)
+        suffix = f".{digest.hexdigest()[:HASH_LENGTH]}{ext}"
+        if max_length:
+            # Trim the stem ourselves: get_available_name would cut into the hash.
+            overflow = len(posixpath.join(directory, stem + suffix)) - max_length
+            if overflow > 0:
+                stem = stem[: max(1, len(stem) - overflow)]
+        return posixpath.join(directory, stem + suffix)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.hashed_name(name, content, max_length)
+        if self.exists(name):
+            return name  # same bytes already stored
+        return super().save(name, content, max_length=max_length)
+
+
+def file_fields():
+    """``[(model, field name)]`` for every file field of this app's models."""
+    return [
+        (model, field.name)
+        for model in apps.get_app_config("main").get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField)
+    ]
+
+
+def referenced_names(names):
+    """The subset of ``names`` still stored in some file field."""
+    names = set(names)
+    found = set()
+    for model, field_name in file_fields():
+        found.update(
+            model._base_manager.filter(**{f"{field_name}__in": names}).values_list(
+                field_name, flat=True
+            )
+        )
+    return found
+
+
+def delete_orphaned_files(names, storage=None):
+    """Delete the files in ``names`` no row references any more, with their derivatives."""
+    from django.core.files.storage import default_storage
+
+    from .images import delete_derivatives
+
+    storage = storage or default_storage
+    names = {name for name in names if name}
+    orphans = names - referenced_names(names)
+    for name in sorted(orphans):
+        try:
+            storage.delete(name)
+            delete_derivatives(name, storage)
+        except OSError:
+            logger.exception("Could not delete orphaned upload %s", name)
+    return orphans
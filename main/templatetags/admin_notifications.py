@@ -1,17 +1,18 @@
 from django import template
 
-from main.models import ContactMessage, Testimonial
+from main.counters import get_count
 
 register = template.Library()
 
 
-# Functions used by Unfold (settings.py)
+# Functions used by Unfold (settings.py). Both read cached counters that
+# main.signals keeps current, so the sidebar badges cost no queries.
 def pending_testimonials_count(request):
-    return Testimonial.objects.filter(is_approved=False).count()
+    return get_count("pending_testimonials")
 
 
 def total_messages_count(request):
-    return ContactMessage.objects.count()
+    return get_count("messages")
 
 
 # Template tag used by admin/base_site.html
@@ -21,4 +22,4 @@ def get_pending_counts():
     Returns the count of pending items (currently only unapproved testimonials).
     This is used in the admin sidebar or header to show notification badges.
     """
-    return Testimonial.objects.filter(is_approved=False).count()
+    return get_count("pending_testimonials")
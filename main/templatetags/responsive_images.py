@@ -0,0 +1,86 @@
+"""Template tags that serve uploads through their resized derivatives.
+
+The tags only read the derivative listings main.images and main.videos cache
+per upload, so rendering never touches Pillow or ffmpeg; an upload without
+derivatives yet renders as its original.
+"""
+
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from main.images import derivative_sources, slideshow_sources
+from main.videos import video_sources
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, sizes, **attrs):
+    """An ``<img>`` of the original, wrapped in a ``<picture>`` offering its derivatives.
+
+    ``sizes`` is the image's rendered width, e.g. ``"(min-width: 768px) 33vw, 100vw"``;
+    any other keyword argument becomes an attribute of the ``<img>``.
+    """
+    img = format_html('<img src="{}"{}>', image.url, flatatt(attrs))
+    sources = derivative_sources(image)
+    if not sources:
+        return img
+    return format_html(
+        "<picture>{}{}</picture>",
+        format_html_join(
+            "",
+            '<source type="{}" srcset="{}" sizes="{}">',
+            (
+                (mime, ", ".join(f"{url} {width}w" for width, url in urls), sizes)
+                for mime, urls in sources
+            ),
+        ),
+        img,
+    )
+
+
+@register.simple_tag
+def background_image_set(image):
+    """A CSS ``image-set()`` of the largest derivative per format, or "" if there are none.
+
+    Meant to follow a plain ``background-image:url(...)`` declaration, which
+    browsers without ``image-set()`` keep using.
+    """
+    candidates = [(urls[-1][1], mime) for mime, urls in derivative_sources(image)]
+    if not candidates:
+        return ""
+    return format_html(
+        "image-set({})",
+        format_html_join(", ", "url('{}') type('{}')", candidates),
+    )
+
+
+@register.simple_tag
+def hero_video(video, **attrs):
+    """A background ``<video>`` that shows its poster first and only preloads metadata.
+
+    Offers the video's renditions, smallest first with viewport media queries,
+    then the original. Keyword arguments become attributes.
+    """
+    found = video_sources(video)
+    if found["poster"]:
+        attrs["poster"] = found["poster"]
+    return format_html(
+        '<video autoplay loop muted playsinline preload="metadata"{}>{}</video>',
+        flatatt(attrs),
+        format_html_join(
+            "",
+            '<source src="{}" type="{}"{}>',
+            (
+                (url, mime, format_html(' media="{}"', media) if media else "")
+                for url, mime, media in found["sources"]
+            ),
+        ),
+    )
+
+
+@register.simple_tag
+def hero_slides(profile):
+    """The hero slides with their srcsets, from main.images' cached listing."""
+    return slideshow_sources(profile)
@@ -0,0 +1,276 @@
+import datetime
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from main.archive import moderate_testimonials
+from main.counters import COUNTERS, _apply, get_count
+from main.models import ContactMessage, Experience, Project, Testimonial
+from main.search import full_text_available
+
+
+def _testimonial(**kwargs):
+    testimonial = Testimonial(name="Ada", **kwargs)
+    testimonial.set_current_language("en")
+    testimonial.quote = "Great work."
+    testimonial.save()
+    return testimonial
+
+
+class AdminCounterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_counts_follow_saves_and_deletes(self):
+        with self.assertNumQueries(4):  # a cold counter is counted twice
+            self.assertEqual(get_count("pending_testimonials"), 0)
+            self.assertEqual(get_count("messages"), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            message = ContactMessage.objects.create(
+                name="Bob", email="bob@example.com", subject="Hi", message="Hello"
+            )
+            pending = _testimonial()
+            _testimonial(is_approved=True)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_count("messages"), 1)
+            self.assertEqual(get_count("pending_testimonials"), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pending.is_approved = True
+            pending.save()
+            message.delete()
+        self.assertEqual(get_count("pending_testimonials"), 0)
+        self.assertEqual(get_count("messages"), 0)
+
+    def test_adjustment_during_a_cold_count_is_kept(self):
+        counts = iter([0, 1])
+
+        def count_messages():
+            count = next(counts)
+            if count == 0:
+                _apply("messages", 1)  # a message commits while the first COUNT runs
+            return count
+
+        with mock.patch.dict(COUNTERS, messages=count_messages):
+            self.assertEqual(get_count("messages"), 1)
+
+    def test_bulk_actions_adjust_the_pending_count(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _i in range(3):
+                _testimonial()
+        self.client.force_login(User.objects.create_superuser("admin", "a@example.com", "pw"))
+        url = reverse("admin:main_testimonial_changelist")
+        pks = list(Testimonial.objects.values_list("pk", flat=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"action": "approve_testimonials", "_selected_action": pks[:2]})
+        self.assertEqual(get_count("pending_testimonials"), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"action": "reject_testimonials", "_selected_action": pks})
+        self.assertEqual(get_count("pending_testimonials"), 3)
+        self.assertEqual(Testimonial.objects.filter(is_approved=False).count(), 3)
+
+    def test_admin_chrome_runs_no_count_queries(self):
+        self.client.force_login(User.objects.create_superuser("admin", "a@example.com", "pw"))
+        url = reverse("admin:index")
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q["sql"] for q in queries if "COUNT(" in q["sql"].upper()])
+
+
+class ChangelistQueryTest(TestCase):
+    """Translated columns must not cost a query per row."""
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser("admin", "a@example.com", "pw"))
+
+    def _add_rows(self, count):
+        for _i in range(count):
+            _testimonial(is_approved=True)
+            project = Project(created_date=datetime.date.today())
+            project.set_current_language("en")
+            project.title = "Shot"
+            project.description = "A project."
+            project.save()
+            experience = Experience(start_date=datetime.date.today())
+            experience.set_current_language("en")
+            experience.job_title = "Engineer"
+            experience.company = "Acme"
+            experience.save()
+
+    def _queries(self, name):
+        cache.clear()  # parler's translation cache would hide per-row lookups
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(f"admin:main_{name}_changelist"))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        names = ("testimonial", "project", "experience")
+        self._add_rows(1)
+        self._queries("testimonial")  # warm the session and content type caches
+        baseline = {name: self._queries(name) for name in names}
+        self._add_rows(5)
+        self.assertEqual({name: self._queries(name) for name in names}, baseline)
+
+
+class ContactMessageChangelistTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser("admin", "a@example.com", "pw"))
+        self.url = reverse("admin:main_contactmessage_changelist")
+
+    def _messages(self, count, **fields):
+        ContactMessage.objects.bulk_create(
+            ContactMessage(
+                name=f"Bot {i}",
+                email="bot@spam.example",
+                subject="Offer",
+                message="Buy now",
+                **fields,
+            )
+            for i in range(count)
+        )
+
+    def test_keyset_pages_cover_every_row_once(self):
+        self._messages(120)
+        get_count("messages")  # the badge counter, warm as on any admin page
+        seen = []
+        url = self.url
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertFalse([q for q in queries if "OFFSET" in q["sql"]])
+            self.assertFalse(
+                [
+                    q
+                    for q in queries
+                    if 'COUNT(*) AS "__count" FROM "main_contactmessage"' in q["sql"]
+                ]
+            )
+            cl = response.context["cl"]
+            self.assertEqual(cl.result_count, 120)
+            seen.extend(message.pk for message in cl.result_list)
+            url = cl.older_url and self.url + cl.older_url
+        self.assertEqual(len(seen), 120)
+        self.assertEqual(seen, sorted(set(seen), reverse=True))
+        self.assertContains(response, "Newest")
+
+    def test_filtered_pages_count_their_matches(self):
+        self._messages(60)
+        for _i in range(3):
+            ContactMessage.objects.create(name="Bob", email="bob@example.com", message="Hello")
+        get_count("messages")
+        response = self.client.get(self.url, {"q": "offer"})
+        self.assertEqual(response.context["cl"].result_count, 60)  # more than one page
+        response = self.client.get(self.url, {"q": "hello"})
+        self.assertEqual(response.context["cl"].result_count, 3)
+
+    def test_malformed_cursor_shows_the_first_page(self):
+        self._messages(3)
+        response = self.client.get(self.url, {"before": "yesterday"})
+        self.assertEqual(len(response.context["cl"].result_list), 3)
+
+    def test_full_text_search_matches_word_prefixes(self):
+        self.assertTrue(full_text_available())
+        self._messages(3)
+        ContactMessage.objects.create(
+            name="Bob", email="bob@example.com", subject="Hi", message="Loved the portfolio"
+        )
+        for query, expected in (("portf", ["Bob"]), ("bob@example.com", ["Bob"]), ("bot buy", 3)):
+            with self.subTest(query=query):
+                names = [
+                    m.name
+                    for m in self.client.get(self.url, {"q": query}).context["cl"].result_list
+                ]
+                self.assertEqual(len(names) if isinstance(expected, int) else names, expected)
+
+        # The index follows edits and deletes.
+        ContactMessage.objects.filter(name="Bob").update(message="Nice site")
+        self.assertFalse(self.client.get(self.url, {"q": "portf"}).context["cl"].result_list)
+        ContactMessage.objects.filter(name="Bob").delete()
+        self.assertFalse(self.client.get(self.url, {"q": "nice"}).context["cl"].result_list)
+
+
+class ArchiveTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.archive_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(ARCHIVE_ROOT=self.archive_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.archive_root)
+
+    def test_command_archives_old_messages_in_batches(self):
+        ContactMessage.objects.bulk_create(
+            ContactMessage(name=f"Bot {i}", email="bot@spam.example", message="Buy now")
+            for i in range(5)
+        )
+        ContactMessage.objects.update(created_at=timezone.now() - datetime.timedelta(days=200))
+        ContactMessage.objects.create(name="Bob", email="bob@example.com", message="Hi")
+
+        self.assertEqual(get_count("messages"), 6)
+
+        out = StringIO()
+        call_command("archive_messages", "--dry-run", stdout=out)
+        self.assertIn("Would archive 5 message(s).", out.getvalue())
+        with (
+            self.captureOnCommitCallbacks(execute=True),
+            CaptureQueriesContext(connection) as queries,
+            mock.patch("main.archive.os.fsync", wraps=os.fsync) as fsync,
+        ):
+            call_command("archive_messages", "--batch-size", "2", stdout=out)
+        self.assertIn("Archived 5 message(s)", out.getvalue())
+        self.assertEqual(fsync.call_count, 3)  # each batch is on disk before its DELETE
+        # One keyset SELECT per batch (plus the empty last one) and one DELETE
+        # per batch: rows are never re-loaded to send post_delete.
+        sql = [q["sql"] for q in queries if "main_contactmessage" in q["sql"]]
+        self.assertEqual(len([q for q in sql if q.startswith("SELECT")]), 4)
+        self.assertEqual(len([q for q in sql if q.startswith("DELETE")]), 3)
+
+        self.assertEqual(list(ContactMessage.objects.values_list("name", flat=True)), ["Bob"])
+        self.assertEqual(get_count("messages"), 1)
+        (path,) = Path(self.archive_root).iterdir()
+        with gzip.open(path, "rt") as archive:
+            rows = [json.loads(line) for line in archive]
+        self.assertEqual([row["name"] for row in rows], [f"Bot {i}" for i in range(5)])
+        self.assertEqual(set(rows[0]), {"id", "name", "email", "subject", "message", "created_at"})
+
+    def test_admin_action_archives_the_selection(self):
+        self.client.force_login(User.objects.create_superuser("admin", "a@example.com", "pw"))
+        message = ContactMessage.objects.create(name="Bot", email="bot@spam.example", message="x")
+        response = self.client.post(
+            reverse("admin:main_contactmessage_changelist"),
+            {"action": "archive_selected", "_selected_action": [message.pk]},
+            follow=True,
+        )
+        self.assertContains(response, "Archived 1 message(s)")
+        self.assertFalse(ContactMessage.objects.exists())
+
+    def test_moderation_commits_in_chunks(self):
+        for _i in range(5):
+            _testimonial()
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = moderate_testimonials(Testimonial.objects.all(), approve=True, batch_size=2)
+        self.assertEqual(changed, 5)
+        self.assertEqual(get_count("pending_testimonials"), 0)
+        self.assertEqual(moderate_testimonials(Testimonial.objects.all(), approve=True), 0)
@@ -0,0 +1,89 @@
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from main.cache_backends import SQLiteCache
+
+
+def _hammer(location, checks):
+    cache = SQLiteCache(location, {})
+    for _i in range(checks):
+        if not cache.add("hits", 1, 60):
+            cache.incr("hits")
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.location = str(Path(self.tmp.name) / "cache.sqlite3")
+        self.cache = SQLiteCache(self.location, {})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trips_values(self):
+        for value in (0, 7, True, None, "text", 2**70, {"a": [1, 2]}):
+            self.cache.set("key", value)
+            self.assertEqual(self.cache.get("key"), value)
+            self.assertIs(type(self.cache.get("key")), type(value))
+        self.assertEqual(self.cache.get("missing", "default"), "default")
+
+    def test_add_only_when_absent(self):
+        self.assertTrue(self.cache.add("key", 1))
+        self.assertFalse(self.cache.add("key", 2))
+        self.assertEqual(self.cache.get("key"), 1)
+
+    def test_incr(self):
+        self.cache.set("key", 1)
+        self.assertEqual(self.cache.incr("key"), 2)
+        self.assertEqual(self.cache.incr("key", 5), 7)
+        self.assertEqual(self.cache.decr("key", 3), 4)
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+
+    def test_expired_entries_are_absent(self):
+        self.cache.set("key", 1, 10)
+        later = time.time() + 11
+        with mock.patch("main.cache_backends.time.time", return_value=later):
+            self.assertIsNone(self.cache.get("key"))
+            self.assertFalse(self.cache.has_key("key"))
+            with self.assertRaises(ValueError):
+                self.cache.incr("key")
+            # A new window starts over rather than continuing the old count.
+            self.assertTrue(self.cache.add("key", 1, 10))
+            self.assertEqual(self.cache.incr("key"), 2)
+
+    def test_shared_between_instances(self):
+        self.cache.set("key", "value")
+        self.assertEqual(SQLiteCache(self.location, {}).get("key"), "value")
+        self.assertTrue(self.cache.delete("key"))
+        self.assertFalse(self.cache.delete("key"))
+
+    def test_close_releases_the_thread_connection(self):
+        self.cache.set("key", 1)
+        connection = self.cache._connection()
+        self.cache.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+        self.assertEqual(self.cache.get("key"), 1)  # reopened on demand
+
+    def test_in_memory_cache_survives_close(self):
+        cache = SQLiteCache(":memory:", {})
+        cache.set("key", 1)
+        cache.close()
+        self.assertEqual(cache.get("key"), 1)
+
+    def test_counts_exactly_across_processes(self):
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_hammer, args=(self.location, 200)) for _i in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(self.cache.get("hits"), 800)
@@ -0,0 +1,288 @@
+import datetime
+import re
+from io import StringIO
+from unittest import mock
+
+from django.contrib.messages import constants
+from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.db.models import F
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from main.caching import (
+    CONTENT_STAMP_KEY,
+    CSRF_TOKEN_PLACEHOLDER,
+    _pending,
+    coalesce_invalidations,
+    get_content_stamp,
+)
+from main.checks import check_shared_page_cache
+from main.models import (
+    _SINGLETON_MEMO,
+    ContactInfo,
+    ContentStamp,
+    Hobby,
+    Profile,
+    Project,
+    SiteSettings,
+    Skill,
+    Testimonial,
+)
+
+
+class SingletonLoadCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        _SINGLETON_MEMO.clear()
+        translation.activate("en")
+        self.profile = Profile.objects.create(name="Dev", bio="Bio")
+        self.profile.set_current_language("fr")
+        self.profile.name = "Dév"
+        self.profile.save()
+
+    def test_warm_load_runs_no_queries(self):
+        # First pass creates the missing singletons, which bumps their versions.
+        for _ in range(2):
+            Profile.load()
+            ContactInfo.load()
+            SiteSettings.load()
+        with self.assertNumQueries(0):
+            self.assertEqual(Profile.load().name, "Dev")
+            ContactInfo.load()
+            SiteSettings.load()
+
+    def test_copy_follows_active_language(self):
+        Profile.load()
+        with translation.override("fr"), self.assertNumQueries(0):
+            self.assertEqual(Profile.load().name, "Dév")
+        self.assertEqual(Profile.load().name, "Dev")
+
+    def test_save_invalidates_memo(self):
+        self.assertEqual(ContactInfo.load().email, "contact@example.com")
+        info = ContactInfo.objects.get(pk=1)
+        info.email = "new@example.com"
+        info.save()
+        self.assertEqual(ContactInfo.load().email, "new@example.com")
+
+    def test_translation_only_save_invalidates_memo(self):
+        Profile.load()
+        profile = Profile.objects.get(pk=1)
+        profile.set_current_language("en")
+        profile.name = "Renamed"
+        profile.save_translations()
+        self.assertEqual(Profile.load().name, "Renamed")
+
+    def test_mutating_a_copy_does_not_leak(self):
+        Profile.load().name = "Scratch"
+        self.assertEqual(Profile.load().name, "Dev")
+
+    def test_save_on_another_worker_follows_the_content_version(self):
+        self.assertEqual(Profile.load().name, "Dev")
+        # Another worker with its own LocMemCache saves: only the database is
+        # shared, so neither this process's memo nor its load() version moves.
+        Profile._parler_meta.root_model.objects.filter(language_code="en").update(name="Renamed")
+        ContentStamp.objects.filter(pk=1).update(version=F("version") + 1)
+        self.assertEqual(Profile.load().name, "Dev")  # the content version is unchanged too
+        cache.delete(CONTENT_STAMP_KEY)  # CONTENT_STAMP_TIMEOUT runs out
+        self.assertEqual(Profile.load().name, "Renamed")
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class HomePageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        _SINGLETON_MEMO.clear()
+        translation.activate("en")
+        self.url = reverse("home")
+        Profile.objects.create(name="Dev", bio="Bio")
+        ContactInfo.objects.create(email="dev@example.com")
+        Skill.objects.create(name="Django")
+        Project.objects.create(title="Portfolio", created_date=datetime.date.today())
+        self.client.get(self.url)  # prime singletons created on first render
+
+    def _csrf_token(self, response):
+        return re.search(rb'name="csrfmiddlewaretoken" value="([^"]+)"', response.content)[1]
+
+    def test_warm_get_runs_no_queries(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, "Portfolio")
+        self.assertNotContains(response, CSRF_TOKEN_PLACEHOLDER)
+
+    def test_cached_page_carries_a_valid_csrf_token(self):
+        self.client.get(self.url)
+        client = Client(enforce_csrf_checks=True)
+        response = client.get(self.url)
+        data = {
+            "csrfmiddlewaretoken": self._csrf_token(response).decode(),
+            "submit_contact": "1",
+            "contact-name": "User",
+            "contact-email": "user@example.com",
+            "contact-message": "Hi",
+        }
+        self.assertRedirects(client.post(self.url, data), self.url)
+
+    def test_content_change_retires_cached_page(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name="Kubernetes")
+        self.assertContains(self.client.get(self.url), "Kubernetes")
+
+    def test_languages_are_cached_separately(self):
+        self.client.get(self.url)
+        response = self.client.get("/fr/")
+        self.assertContains(response, '<html lang="fr">')
+
+    def test_pending_messages_bypass_cache(self):
+        self.client.get(self.url)
+        storage = CookieStorage(None)
+        cookie = storage._encode([Message(constants.SUCCESS, "Your message has been sent")])
+        self.client.cookies[CookieStorage.cookie_name] = cookie
+        self.assertContains(self.client.get(self.url), "Your message has been sent")
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        translation.activate("en")
+        self.url = reverse("home")
+        Profile.objects.create(name="Dev", bio="Bio")
+        self.client.get(self.url)  # prime singletons created on first render
+
+    def test_headers_emitted(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_matching_etag_returns_304_without_queries(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since_returns_304(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_content_change_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name="Go")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_differs_per_language(self):
+        self.assertNotEqual(self.client.get(self.url)["ETag"], self.client.get("/fr/")["ETag"])
+
+
+class FragmentInvalidationTest(TestCase):
+    FRAGMENTS = ("home.skills", "home.projects", "home.hobbies", "home.testimonials")
+
+    def setUp(self):
+        cache.clear()
+        # Saves in earlier tests never commit, so their invalidations are still pending.
+        _pending.fragments.clear()
+        for name in self.FRAGMENTS:
+            for lang in ("en", "fr"):
+                cache.set(make_template_fragment_key(name, [lang]), "html")
+
+    def _cached(self):
+        return {
+            name
+            for name in self.FRAGMENTS
+            if cache.get(make_template_fragment_key(name, ["fr"])) is not None
+        }
+
+    def test_save_only_drops_dependent_fragment(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name="Go")
+        self.assertEqual(self._cached(), {"home.projects", "home.hobbies", "home.testimonials"})
+
+    def test_testimonial_approval_keeps_other_fragments(self):
+        testimonial = Testimonial.objects.create(name="Ann", quote="Great")
+        with self.captureOnCommitCallbacks(execute=True):
+            testimonial.is_approved = True
+            testimonial.save()
+        self.assertNotIn("home.testimonials", self._cached())
+        self.assertIn("home.skills", self._cached())
+
+    def test_translation_only_save_invalidates(self):
+        hobby = Hobby.objects.create(name="Chess")
+        cache.set(make_template_fragment_key("home.hobbies", ["fr"]), "html")
+        hobby.set_current_language("fr")
+        hobby.name = "Échecs"
+        with self.captureOnCommitCallbacks(execute=True):
+            hobby.save_translations()
+        self.assertNotIn("home.hobbies", self._cached())
+
+    def test_one_version_bump_per_transaction(self):
+        version = get_content_stamp()[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            for name in ("Go", "Rust", "Zig"):
+                Skill.objects.create(name=name)
+            Hobby.objects.create(name="Chess")
+        self.assertEqual(get_content_stamp()[0], version + 1)
+        self.assertEqual(self._cached(), {"home.projects", "home.testimonials"})
+
+    def test_coalesce_block_defers_until_exit(self):
+        with self.captureOnCommitCallbacks(execute=True), coalesce_invalidations():
+            Skill.objects.create(name="Go")
+            self.assertIn("home.skills", self._cached())
+        self.assertNotIn("home.skills", self._cached())
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class WarmCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        _SINGLETON_MEMO.clear()
+        Profile.objects.create(name="Dev", bio="Bio")
+        Skill.objects.create(name="Django")
+
+    def test_command_warms_every_language(self):
+        out = StringIO()
+        call_command("warm_cache", "--host", "testserver", "--scheme", "http", stdout=out)
+        self.assertIn("Warmed http://testserver/fr/", out.getvalue())
+        for url in ("/en/", "/fr/"):
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(HOME_CACHE_WARMUP=True)
+    def test_invalidation_schedules_warmup(self):
+        with (
+            mock.patch("main.caching.schedule_warmup") as schedule,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            Skill.objects.create(name="Go")
+            Skill.objects.create(name="Rust")
+        schedule.assert_called_once_with()
+
+    def test_no_warmup_by_default(self):
+        with (
+            mock.patch("main.caching.schedule_warmup") as schedule,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            Skill.objects.create(name="Go")
+        schedule.assert_not_called()
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    REDIS = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+
+    def test_warns_about_a_per_process_cache(self):
+        with override_settings(CACHES=self.LOCMEM):
+            self.assertEqual([w.id for w in check_shared_page_cache(None)], ["main.W001"])
+        with override_settings(CACHES=self.REDIS):
+            self.assertEqual(check_shared_page_cache(None), [])
@@ -0,0 +1,186 @@
+import datetime
+import re
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.template.loader import get_template
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import translation
+
+from main.caching import bump_content_version
+from main.content import load_experiences, load_projects, load_skills
+from main.models import (
+    _SINGLETON_MEMO,
+    Education,
+    Experience,
+    HeroSlide,
+    Hobby,
+    HomeSnapshot,
+    Profile,
+    Project,
+    Recognition,
+    Skill,
+    TechTag,
+    Testimonial,
+)
+from main.snapshot import (
+    SECTIONS,
+    build_snapshot_data,
+    check_snapshot,
+    rebuild_all_snapshots,
+    rebuild_snapshot,
+    snapshot_content,
+)
+
+
+def _create_content(n):
+    tags = [TechTag.objects.get_or_create(name=f"tag{i}")[0] for i in range(3)]
+    today = datetime.date.today()
+    for i in range(n):
+        Skill.objects.create(name=f"Skill {i}", category="LANGUAGES")
+        project = Project.objects.create(title=f"Project {i}", created_date=today)
+        project.tech_tags.set(tags)
+        experience = Experience.objects.create(
+            job_title=f"Job {i}", company="Acme", start_date=today, role_type="INTERNSHIP"
+        )
+        experience.tech_used.set(tags[:1])
+        Education.objects.create(degree=f"Degree {i}", institution="School", start_date=today)
+        Recognition.objects.create(title=f"Award {i}")
+        Hobby.objects.create(name=f"Hobby {i}")
+        Testimonial.objects.create(name=f"Ann {i}", quote="Great", is_approved=True)
+
+
+class ContentLoaderTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        translation.activate("en")
+
+    def test_french_falls_back_to_english_per_row(self):
+        Skill.objects.create(name="Python")
+        skill = Skill.objects.create(name="Testing")
+        skill.set_current_language("fr")
+        skill.name = "Tests"
+        skill.save()
+        with self.assertNumQueries(1):
+            names = {record.name for record in load_skills("fr")}
+        self.assertEqual(names, {"Python", "Tests"})
+        self.assertEqual({record.name for record in load_skills("en")}, {"Python", "Testing"})
+
+    def test_records_carry_display_values_and_tags(self):
+        _create_content(2)
+        with self.assertNumQueries(4):
+            projects = load_projects("en")
+            experiences = load_experiences("en")
+        self.assertEqual([tag.name for tag in projects[0].tech_tags], ["tag0", "tag1", "tag2"])
+        self.assertFalse(projects[0].image)
+        self.assertEqual(experiences[0].get_role_type_display, "Internship")
+        self.assertEqual([tag.name for tag in experiences[0].tech_used], ["tag0"])
+
+
+class SnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        translation.activate("en")
+
+    def _build_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            build_snapshot_data("fr")
+        return len(queries)
+
+    def test_build_query_count_is_constant(self):
+        _create_content(1)
+        baseline = self._build_queries()
+        _create_content(5)
+        self.assertEqual(self._build_queries(), baseline)
+        self.assertEqual(baseline, 9)  # one per section, plus one per tag M2M
+
+    def test_content_change_rebuilds_snapshot_on_next_read(self):
+        rebuild_snapshot("fr")
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name="Go", category="LANGUAGES")
+        # Committing only retires the snapshot; the save pays for no rebuild.
+        self.assertEqual(HomeSnapshot.objects.get(language_code="fr").data["skill_groups"], [])
+        groups = snapshot_content("fr")["skill_groups"]
+        self.assertEqual(groups[0].list[0].name, "Go")
+        self.assertEqual(check_snapshot("fr"), [])
+
+    def test_stale_snapshot_is_not_served(self):
+        rebuild_snapshot("en")
+        Hobby.objects.create(name="Chess")  # never commits, so no version bump
+        bump_content_version()
+        records = snapshot_content("en")["hobbies"]
+        self.assertEqual([hobby.name for hobby in records], ["Chess"])
+
+    def test_records_round_trip_types(self):
+        _create_content(1)
+        rebuild_snapshot("en")
+        cache.clear()
+        content = snapshot_content("en")
+        self.assertIsInstance(content["projects"][0].created_date, datetime.date)
+        self.assertFalse(content["projects"][0].image)
+        self.assertEqual(content["experiences"][0].tech_used[0].name, "tag0")
+        self.assertEqual(content["skill_groups"][0].grouper, "Languages")
+        self.assertEqual(str(content["skill_count"]), "1")
+
+    def test_command_check_reports_drift(self):
+        call_command("rebuild_snapshot", stdout=StringIO())
+        Hobby.objects.create(name="Chess")
+        with self.assertRaises(CommandError):
+            call_command("rebuild_snapshot", "--check", stdout=StringIO())
+        call_command("rebuild_snapshot", "--language", "en", "--language", "fr", stdout=StringIO())
+        call_command("rebuild_snapshot", "--check", stdout=StringIO())
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class HomeQueryCountTest(TestCase):
+    def setUp(self):
+        translation.activate("en")
+        Profile.objects.create(name="Dev", bio="Bio")
+        self.client.get(reverse("home"))  # create the remaining singletons
+
+    def tearDown(self):
+        cache.clear()  # don't leave rendered pages for tests that expect a render
+
+    def test_cold_render_reads_one_snapshot_row(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            _create_content(5)
+        rebuild_all_snapshots()  # as the first read (or warm-up) after the change does
+        cache.clear()
+        _SINGLETON_MEMO.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("home"))
+        self.assertContains(response, "Project 4")
+        self.assertContains(response, "5 entries")
+        self.assertContains(response, "&gt; languages/")
+        content = [q["sql"] for q in queries if "main_homesnapshot" in q["sql"]]
+        self.assertEqual(len(content), 1)
+        # The snapshot, the content stamp, and two queries per translated singleton.
+        self.assertLessEqual(len(queries), 7)
+
+    def test_warm_render_runs_no_queries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            _create_content(3)
+            profile = Profile.objects.get()
+            profile.hero_bg_type = "SLIDESHOW"
+            profile.save()
+            HeroSlide.objects.create(profile=profile, image="hero/slides/one.jpg")
+        # Distinct URLs miss the page cache, so the second is a full render
+        # against warm fragments, snapshot and singletons.
+        self.client.get(reverse("home") + "?visit=1")
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("home") + "?visit=2")
+        self.assertContains(response, "hero/slides/one.jpg")
+        self.assertContains(response, 'id="testimonials"')
+
+    def test_sections_are_only_read_inside_fragments(self):
+        """Outside {% cache %} blocks the template may only use the section counts."""
+        source = get_template("main/home.html").template.source
+        outside = re.sub(r"{% cache .*?{% endcache %}", "", source, flags=re.DOTALL)
+        tags = " ".join(re.findall(r"{[{%](.*?)[%}]}", outside, flags=re.DOTALL))
+        names = set(re.findall(r"\b\w+\b", re.sub(r"(['\"]).*?\1", "", tags)))
+        self.assertEqual(names & set(SECTIONS), set())
+        self.assertIn("testimonials_count", names)
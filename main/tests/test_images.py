@@ -0,0 +1,172 @@
+import datetime
+import io
+import multiprocessing
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from main import images
+from main.image_encoding import render_derivatives, target_widths
+from main.images import (
+    available_formats,
+    derivative_sources,
+    process_image_jobs,
+    scan_derivatives,
+    slideshow_sources,
+)
+from main.models import HeroSlide, Hobby, ImageJob, Profile, Project
+
+
+def _png(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGBA", (width, height), (245, 158, 11, 255)).save(buffer, "PNG")
+    return SimpleUploadedFile("shot.png", buffer.getvalue(), content_type="image/png")
+
+
+def _project(image):
+    return Project.objects.create(title="Shot", image=image, created_date=datetime.date.today())
+
+
+class ImageDerivativeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_target_widths_are_capped_at_the_original(self):
+        self.assertEqual(target_widths((320, 640, 1280), 1000), [320, 640, 1000])
+        self.assertEqual(target_widths((320, 640, 1280), 4000), [320, 640, 1280])
+        self.assertEqual(target_widths((28, 56), 16), [16])
+
+    def test_upload_is_queued_and_built_off_request(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = _project(_png(1000, 500))
+        self.assertEqual(derivative_sources(project.image), [])
+        self.assertEqual(process_image_jobs(), (1, 0))
+
+        sources = dict(derivative_sources(project.image))
+        self.assertEqual(set(sources), {f"image/{fmt}" for fmt in available_formats()})
+        self.assertEqual([width for width, _url in sources["image/webp"]], [320, 640, 1000])
+        name = scan_derivatives(project.image.name, project.image.storage)[(640, "webp")]
+        with project.image.storage.open(name) as handle:
+            self.assertEqual(Image.open(handle).size, (640, 320))
+        job = ImageJob.objects.get()
+        self.assertEqual(job.status, ImageJob.STATUS_DONE)
+        self.assertEqual(len(job.content_hash), 64)
+
+        # Saving again neither re-queues nor rebuilds.
+        project.save()
+        self.assertEqual(process_image_jobs(), (0, 0))
+
+    def test_rebuild_replaces_the_earlier_derivative(self):
+        project = _project(_png(1000, 500))
+        process_image_jobs()
+        name = project.image.name
+        old = scan_derivatives(name, project.image.storage, use_cache=False)[(320, "webp")]
+
+        # A new encoder build of a width that already exists.
+        ImageJob.objects.update(status=ImageJob.STATUS_PENDING, attempts=0)
+        with mock.patch("main.images.render_derivatives", return_value={(320, "webp"): b"v2"}):
+            self.assertEqual(process_image_jobs(), (1, 0))
+
+        found = scan_derivatives(name, project.image.storage, use_cache=False)
+        self.assertNotEqual(found[(320, "webp")], old)
+        self.assertFalse(project.image.storage.exists(old))
+        _dirs, files = project.image.storage.listdir("projects")
+        self.assertEqual(len([f for f in files if ".320w." in f and f.endswith(".webp")]), 1)
+
+    @override_settings(IMAGE_WORKERS=2)
+    def test_background_pass_leaves_no_encoder_processes(self):
+        project = _project(_png(1000, 500))
+        images._drain_in_thread()
+        self.assertEqual(ImageJob.objects.get().status, ImageJob.STATUS_DONE)
+        self.assertTrue(derivative_sources(project.image))
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    @override_settings(
+        STORAGES={
+            **settings.STORAGES,
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        }
+    )
+    def test_identical_upload_copies_derivatives(self):
+        """Without content-hashed names, identical uploads still share the encoding work."""
+        first = _project(_png(700, 400))
+        process_image_jobs()
+        second = _project(_png(700, 400))
+        self.assertNotEqual(first.image.name, second.image.name)
+        with mock.patch("main.images.render_derivatives", wraps=render_derivatives) as render:
+            self.assertEqual(process_image_jobs(), (1, 0))
+        render.assert_not_called()
+        self.assertEqual(
+            derivative_sources(second.image)[0][1][0][1], f"{second.image.url}.320w.avif"
+        )
+
+    def test_unreadable_image_fails_after_retries(self):
+        fake = SimpleUploadedFile("icon.png", b"not an image", content_type="image/png")
+        hobby = Hobby.objects.create(name="Chess", icon=fake)
+        with self.assertLogs("main.images", "WARNING"):
+            for _attempt in range(3):
+                self.assertEqual(process_image_jobs(), (0, 1))
+        self.assertEqual(ImageJob.objects.get().status, ImageJob.STATUS_FAILED)
+        self.assertEqual(derivative_sources(hobby.icon), [])
+
+    def test_command_backfills_every_image(self):
+        project = _project(_png(400, 300))
+        ImageJob.objects.all().delete()
+        out = StringIO()
+        call_command("build_derivatives", "--all", "--workers", "0", stdout=out)
+        self.assertIn("Queued 1 image(s).", out.getvalue())
+        self.assertIn("Derivatives built for 1 image(s), 0 failed.", out.getvalue())
+        self.assertTrue(derivative_sources(project.image))
+
+    def test_tag_emits_srcset_with_original_fallback(self):
+        template = Template(
+            '{% load responsive_images %}{% responsive_image image sizes="600px" alt="Shot" %}'
+        )
+        project = _project(_png(700, 400))
+        html = template.render(Context({"image": project.image}))
+        self.assertEqual(html, f'<img src="{project.image.url}" alt="Shot">')
+
+        process_image_jobs()
+        html = template.render(Context({"image": project.image}))
+        self.assertIn('<source type="image/webp"', html)
+        self.assertRegex(html, rf"{project.image.url}\.320w\.[0-9a-f]+\.webp 320w")
+        self.assertIn('sizes="600px"', html)
+        self.assertTrue(html.endswith(f'<img src="{project.image.url}" alt="Shot"></picture>'))
+
+    def test_slideshow_defers_all_but_the_first_slide(self):
+        profile = Profile.load()
+        profile.hero_bg_type = "SLIDESHOW"
+        profile.save()
+        for order in (1, 2):
+            HeroSlide.objects.create(profile=profile, order=order, image=_png(800 * order, 400))
+        process_image_jobs()
+
+        profile = Profile.load()
+        slides = slideshow_sources(profile)
+        self.assertEqual(len(slides), 2)
+        self.assertIn("800w", dict(slides[0]["sources"])["image/webp"])
+        with self.assertNumQueries(0):
+            self.assertEqual(slideshow_sources(profile), slides)
+
+        html = Template("{% extends 'main/home.html' %}").render(Context({"profile": profile}))
+        first, second = html.split('<picture class="slide')[1:3]
+        self.assertIn(f'src="{slides[0]["src"]}" fetchpriority="high"', first)
+        self.assertIn(' srcset="', first)
+        self.assertIn(f'data-src="{slides[1]["src"]}"', second)
+        self.assertNotIn(" srcset=", second)
@@ -0,0 +1,100 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from main.media import parse_range, serve_media
+
+CONTENT = bytes(range(256)) * 4  # 1 KiB
+
+
+class MediaServingTest(SimpleTestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        (Path(self.media_root) / "hero").mkdir()
+        (Path(self.media_root) / "hero" / "clip.mp4").write_bytes(CONTENT)
+        (Path(self.media_root) / "hero" / "clip.3f9a0c1b2d4e.mp4").write_bytes(CONTENT)
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, MEDIA_SENDFILE="", MEDIA_CACHE_MAX_AGE=600
+        )
+        self.settings_override.enable()
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def _get(self, path, **headers):
+        return serve_media(self.factory.get(f"/media/{path}", headers=headers), path)
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range("bytes=0-99", 1024), (0, 99))
+        self.assertEqual(parse_range("bytes=1000-", 1024), (1000, 1023))
+        self.assertEqual(parse_range("bytes=-24", 1024), (1000, 1023))
+        self.assertEqual(parse_range("bytes=1000-5000", 1024), (1000, 1023))
+        self.assertIsNone(parse_range("bytes=0-1,5-9", 1024))
+        self.assertIsNone(parse_range(None, 1024))
+        with self.assertRaises(ValueError):
+            parse_range("bytes=2000-", 1024)
+
+    def test_full_file_with_cache_headers(self):
+        response = self._get("hero/clip.mp4")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertEqual(response["Content-Length"], "1024")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Cache-Control"], "public, max-age=600")
+
+    def test_hashed_name_is_immutable(self):
+        response = self._get("hero/clip.3f9a0c1b2d4e.mp4")
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_range_request_returns_the_slice(self):
+        response = self._get("hero/clip.mp4", range="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[100:200])
+        self.assertEqual(response["Content-Range"], "bytes 100-199/1024")
+        self.assertEqual(response["Content-Length"], "100")
+
+        response = self._get("hero/clip.mp4", range="bytes=5000-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */1024")
+
+    def test_stale_if_range_sends_whole_file(self):
+        response = self._get("hero/clip.mp4", range="bytes=0-9", if_range='"old"')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_conditional_get(self):
+        etag = self._get("hero/clip.mp4")["ETag"]
+        self.assertEqual(self._get("hero/clip.mp4", if_none_match=etag).status_code, 304)
+        weak = f'"other", W/{etag}'
+        self.assertEqual(self._get("hero/clip.mp4", if_none_match=weak).status_code, 304)
+        response = self._get("hero/clip.mp4", if_none_match='"other"')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_sendfile_offload(self):
+        with override_settings(
+            MEDIA_SENDFILE="x-accel-redirect", MEDIA_ACCEL_REDIRECT_PREFIX="/protected-media/"
+        ):
+            response = self._get("hero/clip.mp4")
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/hero/clip.mp4")
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["Content-Type"], "video/mp4")
+
+        with override_settings(MEDIA_SENDFILE="x-sendfile"):
+            response = self._get("hero/clip.mp4")
+        self.assertEqual(response["X-Sendfile"], str(Path(self.media_root) / "hero" / "clip.mp4"))
+
+        with override_settings(MEDIA_SENDFILE="x-accel"), self.assertRaises(ImproperlyConfigured):
+            self._get("hero/clip.mp4")
+
+    def test_paths_outside_media_root_are_not_found(self):
+        for path in ("../etc/passwd", "hero", "hero/missing.mp4", "hero/clip.mp4/x"):
+            with self.subTest(path=path), self.assertRaises(Http404):
+                self._get(path)
@@ -0,0 +1,92 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from main.images import process_image_jobs, scan_derivatives
+from main.models import Project
+from main.storage import HashedFileSystemStorage, is_hashed_name
+from main.tests.test_images import _png, _project
+
+
+class HashedStorageTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_names_follow_content(self):
+        storage = HashedFileSystemStorage()
+        first = storage.save("resume/cv.pdf", ContentFile(b"v1"))
+        self.assertRegex(first, r"^resume/cv\.[0-9a-f]{12}\.pdf$")
+        self.assertEqual(storage.save("resume/cv.pdf", ContentFile(b"v1")), first)
+        self.assertEqual(storage.save(first, ContentFile(b"v1")), first)
+        self.assertNotEqual(storage.save("resume/cv.pdf", ContentFile(b"v2")), first)
+        self.assertEqual(len(storage.listdir("resume")[1]), 2)
+
+    def test_long_names_keep_their_hash(self):
+        name = HashedFileSystemStorage().save(
+            "resume/" + "x" * 120 + ".pdf", ContentFile(b"v1"), max_length=100
+        )
+        self.assertEqual(len(name), 100)
+        self.assertRegex(name, r"x\.[0-9a-f]{12}\.pdf$")
+
+    def test_only_names_the_storage_writes_count_as_hashed(self):
+        storage = HashedFileSystemStorage()
+        self.assertTrue(is_hashed_name(storage.save("resume/cv.pdf", ContentFile(b"v1"))))
+        self.assertTrue(is_hashed_name("projects/shot.1deaec0095ef.png.320w.3f9a0c1b2d4e.webp"))
+        self.assertFalse(is_hashed_name("resume/scan.20240101123456.pdf"))
+        self.assertFalse(is_hashed_name("resume/cv.1deaec0095ef.final.pdf"))
+        self.assertFalse(is_hashed_name("resume/cv.pdf"))
+
+    def test_replaced_upload_is_deleted_with_its_derivatives(self):
+        project = _project(_png(400, 300))
+        process_image_jobs()
+        old = project.image.name
+        self.assertTrue(scan_derivatives(old, default_storage))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            project.image = _png(500, 300)
+            project.save()
+        self.assertFalse(default_storage.exists(old))
+        self.assertEqual(scan_derivatives(old, default_storage, use_cache=False), {})
+
+    def test_shared_upload_survives_until_unreferenced(self):
+        first = _project(_png(400, 300))
+        second = _project(_png(400, 300))
+        self.assertEqual(first.image.name, second.image.name)
+        name = first.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(default_storage.exists(name))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(default_storage.exists(name))
+
+    def test_command_renames_legacy_uploads(self):
+        legacy = FileSystemStorage().save("projects/old.png", _png(400, 300))
+        project = _project(None)
+        Project.objects.filter(pk=project.pk).update(image=legacy)
+
+        out = StringIO()
+        call_command("hash_media", "--dry-run", stdout=out)
+        self.assertIn("Would rename projects/old.png", out.getvalue())
+        self.assertTrue(default_storage.exists(legacy))
+
+        call_command("hash_media", stdout=StringIO())
+        project.refresh_from_db()
+        self.assertRegex(project.image.name, r"^projects/old\.[0-9a-f]{12}\.png$")
+        self.assertTrue(default_storage.exists(project.image.name))
+        self.assertFalse(default_storage.exists(legacy))
+        self.assertEqual(process_image_jobs(), (1, 0))
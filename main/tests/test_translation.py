@@ -0,0 +1,334 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from main.drains import RETRY_DELAY, Drain, next_wakeup
+from main.models import Hobby, Skill, TranslationJob, TranslationMemory
+from main.translation import (
+    JOB_LEASE,
+    MAX_ATTEMPTS,
+    memory_stats,
+    process_jobs,
+    stale_sources,
+)
+from main.translation_backends import (
+    BATCH_CHAR_LIMIT,
+    BATCH_SEPARATOR,
+    DictionaryBackend,
+    FakeBackend,
+    GoogleBackend,
+    NoopBackend,
+    get_backend,
+    translate_texts,
+)
+
+
+class FakeTranslator:
+    """Prefixes each separator-delimited segment with "FR:" and records calls."""
+
+    def __init__(self, fail_times=0, mangle=False):
+        self.calls = []
+        self.fail_times = fail_times
+        self.mangle = mangle
+
+    def translate(self, text):
+        self.calls.append(text)
+        if len(self.calls) <= self.fail_times:
+            raise RuntimeError("quota exceeded")
+        parts = [f"FR:{part}" for part in text.split(BATCH_SEPARATOR)]
+        return (" " if self.mangle else BATCH_SEPARATOR).join(parts)
+
+
+def _google_backend(translator):
+    return mock.patch("main.translation.get_backend", return_value=GoogleBackend(translator))
+
+
+def _fake_translator(fail=False):
+    return _google_backend(FakeTranslator(fail_times=10_000 if fail else 0))
+
+
+class DrainTest(SimpleTestCase):
+    def test_wakeup_during_a_pass_runs_another(self):
+        entered, release, done = threading.Event(), threading.Event(), threading.Event()
+        passes = []
+
+        def drain():
+            passes.append(len(passes))
+            if len(passes) == 1:
+                entered.set()
+                release.wait(5)
+            else:
+                done.set()
+
+        background = Drain("test", drain)
+        background.start()
+        self.assertTrue(entered.wait(5))
+        background.start()  # the only slot is busy: must not be dropped
+        release.set()
+        self.assertTrue(done.wait(5))
+        self.assertEqual(passes, [0, 1])
+
+    def test_left_over_jobs_schedule_a_retry(self):
+        retried = threading.Event()
+        passes = []
+
+        def drain():
+            passes.append(len(passes))
+            if len(passes) == 2:
+                retried.set()
+
+        # The first pass leaves a job behind; the second leaves nothing.
+        wakeups = iter([0.01, None])
+        Drain("test", drain, wakeup=lambda: next(wakeups)).start()
+        self.assertTrue(retried.wait(5))
+
+
+class NextWakeupTest(TestCase):
+    def test_no_jobs(self):
+        self.assertIsNone(next_wakeup(TranslationJob, JOB_LEASE))
+
+    def test_failed_attempts_back_off(self):
+        TranslationJob.objects.create(model_label="main.hobby", object_id=1, attempts=2)
+        self.assertEqual(next_wakeup(TranslationJob, JOB_LEASE), RETRY_DELAY * 2)
+
+    def test_running_job_is_retried_after_its_lease(self):
+        TranslationJob.objects.create(
+            model_label="main.hobby", object_id=1, status=TranslationJob.STATUS_RUNNING
+        )
+        TranslationJob.objects.update(updated_at=timezone.now() - JOB_LEASE + timedelta(seconds=60))
+        self.assertAlmostEqual(next_wakeup(TranslationJob, JOB_LEASE), 61, delta=5)
+
+
+@mock.patch("main.translation_backends.RETRY_BACKOFF", 0)
+class TranslationQueueTest(TestCase):
+    def setUp(self):
+        cache.clear()  # parler caches translations by pk, which tests reuse
+
+    def test_en_save_queues_one_job_per_row(self):
+        hobby = Hobby.objects.create(name="Chess", description="Openings")
+        hobby.description = "Endgames"
+        hobby.save()
+        self.assertEqual(TranslationJob.objects.count(), 1)
+        job = TranslationJob.objects.get()
+        self.assertEqual((job.model_label, job.object_id), ("main.hobby", hobby.pk))
+
+    def test_fr_save_queues_nothing(self):
+        skill = Skill(category="OTHER")
+        skill.set_current_language("fr")
+        skill.name = "Échecs"
+        skill.save()
+        self.assertFalse(TranslationJob.objects.exists())
+
+    def test_process_jobs_writes_french_and_clears_queue(self):
+        hobby = Hobby.objects.create(name="Chess", description="Openings")
+        with _fake_translator():
+            self.assertEqual(process_jobs(), (1, 0))
+        hobby = Hobby.objects.get(pk=hobby.pk)
+        hobby.set_current_language("fr")
+        self.assertEqual(hobby.name, "FR:Chess")
+        self.assertEqual(hobby.description, "FR:Openings")
+        self.assertFalse(TranslationJob.objects.exists())
+
+    def test_failures_are_retried_then_parked(self):
+        hobby = Hobby.objects.create(name="Chess")
+        with _fake_translator(fail=True), self.assertLogs("main.translation", "ERROR"):
+            for _ in range(MAX_ATTEMPTS):
+                self.assertEqual(process_jobs(), (0, 1))
+            self.assertEqual(process_jobs(), (0, 0))
+        job = TranslationJob.objects.get()
+        self.assertEqual(job.status, TranslationJob.STATUS_FAILED)
+        self.assertIn("quota exceeded", job.last_error)
+        self.assertFalse(hobby.has_translation("fr"))
+
+    def test_resave_rearms_failed_job(self):
+        hobby = Hobby.objects.create(name="Chess")
+        TranslationJob.objects.update(status=TranslationJob.STATUS_FAILED, attempts=MAX_ATTEMPTS)
+        hobby.name = "Go"
+        hobby.save()
+        job = TranslationJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (TranslationJob.STATUS_PENDING, 0))
+
+    def test_deleted_row_drops_job(self):
+        Hobby.objects.create(name="Chess").delete()
+        with _fake_translator():
+            self.assertEqual(process_jobs(), (1, 0))
+        self.assertFalse(TranslationJob.objects.exists())
+
+    def test_translate_worker_once(self):
+        Hobby.objects.create(name="Chess")
+        out = StringIO()
+        with _fake_translator():
+            call_command("translate_worker", "--once", stdout=out)
+        self.assertIn("1 done, 0 failed", out.getvalue())
+
+    def test_drain_sends_one_request_for_many_rows(self):
+        for name in ("Chess", "Go", "Chess"):
+            Hobby.objects.create(name=name, description="Board games")
+        translator = FakeTranslator()
+        with _google_backend(translator):
+            self.assertEqual(process_jobs(), (3, 0))
+        # Distinct strings only: "Chess", "Board games", "Go".
+        self.assertEqual(len(translator.calls), 1)
+        self.assertEqual(translator.calls[0].count(BATCH_SEPARATOR), 2)
+
+
+@mock.patch("main.translation_backends.RETRY_BACKOFF", 0)
+class TranslationMemoryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_repeated_strings_skip_the_translator(self):
+        Hobby.objects.create(name="Chess", description="Board games")
+        with _fake_translator():
+            process_jobs()
+        self.assertEqual(TranslationMemory.objects.count(), 2)
+
+        hobby = Hobby.objects.create(name="Chess", description="Board games")
+        before = memory_stats()
+        with mock.patch("main.translation.get_backend") as get_backend:
+            self.assertEqual(process_jobs(), (1, 0))
+        get_backend.assert_not_called()
+        hobby = Hobby.objects.get(pk=hobby.pk)
+        hobby.set_current_language("fr")
+        self.assertEqual(hobby.name, "FR:Chess")
+        self.assertEqual(memory_stats()["hits"] - before["hits"], 2)
+        self.assertEqual(TranslationMemory.objects.get(source_text="Chess").hits, 1)
+
+    def test_only_new_strings_are_sent(self):
+        Hobby.objects.create(name="Chess")
+        with _fake_translator():
+            process_jobs()
+        Hobby.objects.create(name="Chess", description="Openings")
+        translator = FakeTranslator()
+        before = memory_stats()
+        with _google_backend(translator):
+            process_jobs()
+        self.assertEqual(translator.calls, ["Openings"])
+        self.assertEqual(memory_stats()["misses"] - before["misses"], 1)
+
+
+@mock.patch("main.translation_backends.RETRY_BACKOFF", 0)
+class IncrementalTranslationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.hobby = Hobby.objects.create(name="Chess", description="Openings")
+        with _fake_translator():
+            process_jobs()
+
+    def _french(self, field):
+        hobby = Hobby.objects.get(pk=self.hobby.pk)
+        hobby.set_current_language("fr")
+        return getattr(hobby, field)
+
+    def test_unchanged_resave_queues_nothing(self):
+        Hobby.objects.get(pk=self.hobby.pk).save()
+        self.assertFalse(TranslationJob.objects.exists())
+        self.assertFalse(stale_sources().exists())
+
+    def test_only_changed_field_is_retranslated(self):
+        hobby = Hobby.objects.get(pk=self.hobby.pk)
+        hobby.description = "Endgames"
+        hobby.save()
+        self.assertEqual(list(stale_sources().values_list("field", flat=True)), ["description"])
+        translator = FakeTranslator()
+        with _google_backend(translator):
+            self.assertEqual(process_jobs(), (1, 0))
+        self.assertEqual(translator.calls, ["Endgames"])
+        self.assertEqual(self._french("description"), "FR:Endgames")
+        self.assertEqual(self._french("name"), "FR:Chess")
+        self.assertFalse(stale_sources().exists())
+
+    def test_hand_written_french_is_up_to_date_until_english_changes(self):
+        hobby = Hobby.objects.get(pk=self.hobby.pk)
+        hobby.set_current_language("fr")
+        hobby.name = "Échecs"
+        hobby.save()
+        self.assertFalse(stale_sources().exists())
+        hobby.set_current_language("en")
+        hobby.name = "Chess & Go"
+        hobby.save()
+        self.assertEqual(TranslationJob.objects.count(), 1)
+        with _fake_translator():
+            process_jobs()
+        self.assertEqual(self._french("name"), "FR:Chess & Go")
+
+    def test_admin_lists_stale_french(self):
+        Hobby.objects.create(name="Go")
+        self.client.force_login(User.objects.create_superuser("admin", "a@example.com", "pw"))
+        response = self.client.get(reverse("admin:main_hobby_changelist"), {"french": "stale"})
+        self.assertEqual([obj.name for obj in response.context["cl"].result_list], ["Go"])
+
+
+class TranslationBackendTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _french_name(self, hobby):
+        hobby = Hobby.objects.get(pk=hobby.pk)
+        return hobby.safe_translation_getter("name", language_code="fr", any_language=False)
+
+    @override_settings(
+        TRANSLATION_BACKEND="main.translation_backends.FakeBackend",
+        TRANSLATION_BACKEND_OPTIONS={"prefix": "fr-"},
+    )
+    def test_backend_comes_from_settings(self):
+        backend = get_backend()
+        self.assertIsInstance(backend, FakeBackend)
+        self.assertIs(get_backend(), backend)
+        hobby = Hobby.objects.create(name="Chess")
+        self.assertEqual(process_jobs(), (1, 0))
+        self.assertEqual(self._french_name(hobby), "fr-Chess")
+        self.assertEqual(backend.calls, 1)
+
+    @override_settings(TRANSLATION_BACKEND="main.translation_backends.NoopBackend")
+    def test_noop_backend_completes_without_french(self):
+        self.assertIsInstance(get_backend(), NoopBackend)
+        hobby = Hobby.objects.create(name="Chess")
+        self.assertEqual(process_jobs(), (1, 0))
+        self.assertFalse(Hobby.objects.get(pk=hobby.pk).has_translation("fr"))
+        self.assertFalse(TranslationMemory.objects.exists())
+
+    @override_settings(
+        TRANSLATION_BACKEND="main.translation_backends.DictionaryBackend",
+        TRANSLATION_BACKEND_OPTIONS={"translations": {"Chess": "Échecs"}},
+    )
+    def test_dictionary_backend_translates_known_strings_only(self):
+        self.assertIsInstance(get_backend(), DictionaryBackend)
+        hobby = Hobby.objects.create(name="Chess", description="Openings")
+        self.assertEqual(process_jobs(), (1, 0))
+        self.assertEqual(self._french_name(hobby), "Échecs")
+        self.assertEqual(TranslationMemory.objects.get().source_text, "Chess")
+
+
+@mock.patch("main.translation_backends.RETRY_BACKOFF", 0)
+class TranslateTextsTest(TestCase):
+    def test_preserves_order(self):
+        texts = ["one", "two", "three"]
+        self.assertEqual(translate_texts(texts, FakeTranslator()), ["FR:one", "FR:two", "FR:three"])
+
+    def test_splits_payloads_at_char_limit(self):
+        texts = ["x" * (BATCH_CHAR_LIMIT // 3)] * 3
+        translator = FakeTranslator()
+        self.assertEqual(len(translate_texts(texts, translator)), 3)
+        self.assertEqual(len(translator.calls), 2)
+
+    def test_mangled_separator_falls_back_to_single_requests(self):
+        translator = FakeTranslator(mangle=True)
+        with self.assertLogs("main.translation_backends", "WARNING"):
+            result = translate_texts(["one", "two"], translator)
+        self.assertEqual(result, ["FR:one", "FR:two"])
+        self.assertEqual(len(translator.calls), 3)
+
+    def test_retries_transient_failures(self):
+        translator = FakeTranslator(fail_times=2)
+        with self.assertLogs("main.translation_backends", "WARNING"):
+            self.assertEqual(translate_texts(["one"], translator), ["FR:one"])
+        self.assertEqual(len(translator.calls), 3)
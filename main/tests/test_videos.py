@@ -0,0 +1,113 @@
+import shutil
+import subprocess
+import tempfile
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from main.images import JOB_LEASE, claim_next_job, process_image_jobs, video_job_lease
+from main.models import ImageJob, Profile
+from main.videos import ffmpeg_binary, scan_video_derivatives, video_sources
+
+TEMPLATE = Template('{% load responsive_images %}{% hero_video video class="bg" %}')
+
+
+def _profile(video):
+    profile = Profile.objects.create()
+    profile.set_current_language("en")
+    profile.name = "Test Profile"
+    profile.hero_bg_type = "VIDEO"
+    profile.hero_video_file = video
+    profile.save()
+    return profile
+
+
+class HeroVideoTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    @override_settings(FFMPEG_BINARY="/nonexistent/ffmpeg")
+    def test_without_ffmpeg_the_original_plays(self):
+        profile = _profile(SimpleUploadedFile("clip.webm", b"fakevideo"))
+        with self.assertLogs("main.images", "WARNING"):
+            self.assertEqual(process_image_jobs(), (0, 1))
+        job = ImageJob.objects.get()
+        self.assertEqual(job.status, ImageJob.STATUS_FAILED)
+        self.assertEqual(job.last_error, "ffmpeg not found")
+
+        html = TEMPLATE.render(Context({"video": profile.hero_video_file}))
+        self.assertEqual(
+            html,
+            '<video autoplay loop muted playsinline preload="metadata" class="bg">'
+            f'<source src="{profile.hero_video_file.url}" type="video/webm"></video>',
+        )
+
+    def test_a_running_transcode_is_not_reclaimed_after_the_image_lease(self):
+        _profile(SimpleUploadedFile("clip.mp4", b"fakevideo"))
+        image = ImageJob.objects.create(
+            name="projects/a.png", model_label="main.project", field="image"
+        )
+        touched = timezone.now() - JOB_LEASE - timedelta(minutes=1)
+        ImageJob.objects.update(status=ImageJob.STATUS_RUNNING, updated_at=touched)
+        self.assertEqual(claim_next_job(), image)
+        self.assertIsNone(claim_next_job())
+
+        ImageJob.objects.filter(pk=image.pk).delete()
+        ImageJob.objects.update(
+            updated_at=timezone.now() - video_job_lease() - timedelta(minutes=1)
+        )
+        self.assertEqual(claim_next_job().field, "hero_video_file")
+
+    def test_renditions_and_poster_are_offered(self):
+        profile = _profile(SimpleUploadedFile("clip.mp4", b"fakevideo"))
+        name = profile.hero_video_file.name
+        for suffix in ("poster.0123456789ab.webp", "poster.jpg", "720p.mp4", "1080p.mp4"):
+            (Path(self.media_root) / f"{name}.{suffix}").write_bytes(b"x")
+        self.assertEqual(
+            set(scan_video_derivatives(name, profile.hero_video_file.storage)),
+            {"poster.webp", "poster.jpg", "720p.mp4", "1080p.mp4"},
+        )
+
+        url = profile.hero_video_file.url
+        self.assertEqual(
+            video_sources(profile.hero_video_file)["poster"], f"{url}.poster.0123456789ab.webp"
+        )
+        html = TEMPLATE.render(Context({"video": profile.hero_video_file}))
+        self.assertIn(f'poster="{url}.poster.0123456789ab.webp"', html)
+        self.assertIn(
+            f'<source src="{url}.720p.mp4" type="video/mp4" media="(max-width: 1280px)">', html
+        )
+        # The original stays as the last resort for browsers that cannot play H.264.
+        self.assertIn(
+            f'<source src="{url}.1080p.mp4" type="video/mp4">'
+            f'<source src="{url}" type="video/mp4"></video>',
+            html,
+        )
+
+    @unittest.skipUnless(ffmpeg_binary(), "ffmpeg is not installed")
+    def test_ffmpeg_builds_poster_and_capped_renditions(self):
+        clip = Path(self.media_root) / "source.mp4"
+        subprocess.run(
+            [ffmpeg_binary(), "-v", "error", "-f", "lavfi", "-i", "testsrc=size=1280x720:rate=10"]
+            + ["-t", "2", "-pix_fmt", "yuv420p", str(clip)],
+            check=True,
+        )
+        profile = _profile(SimpleUploadedFile("clip.mp4", clip.read_bytes()))
+        self.assertEqual(process_image_jobs(), (1, 0))
+        found = scan_video_derivatives(
+            profile.hero_video_file.name, profile.hero_video_file.storage
+        )
+        self.assertEqual(set(found), {"poster.webp", "poster.jpg", "720p.mp4"})
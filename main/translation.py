@@ -0,0 +1,373 @@
+"""EN->FR auto-translation, run as queued jobs off the request thread.
+
+Every translated field carries a TranslationSource recording a hash of its
+current EN text and of the EN text its French was made from. Saving the EN
+translation of a row refreshes the first; if any field's French is now stale,
+a TranslationJob is recorded (one per row, so bursts of saves collapse) and,
+once the transaction commits, a small fixed-size thread pool is nudged to drain
+the queue. Only stale fields are re-translated. Drains claim jobs in batches and
+send every missing string of the batch in as few translator requests as the
+payload cap allows; strings translated before are answered from the persistent
+translation memory without a network call. Jobs live in the database, so work
+interrupted by a gunicorn worker recycle is picked up again when a worker
+boots (or by ``manage.py translate_worker``); failed jobs are retried after a
+growing delay (see main.drains).
+"""
+
+import hashlib
+import logging
+import threading
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from parler.models import TranslationDoesNotExist
+
+from .caching import coalesce_invalidations
+from .drains import Drain, next_wakeup
+from .models import TranslationJob, TranslationMemory, TranslationSource
+from .translation_backends import get_backend
+
+logger = logging.getLogger(__name__)
+
+# A job is retried this many times before it is parked as FAILED.
+MAX_ATTEMPTS = 3
+
+# A RUNNING job not touched for this long belongs to a dead worker and is reclaimed.
+JOB_LEASE = timedelta(minutes=10)
+
+# Jobs claimed and translated together in one batched pass.
+BATCH_SIZE = 50
+
+# Process-wide translation memory counters, reported by translate_worker.
+_memory_stats = Counter()
+_memory_stats_lock = threading.Lock()
+
+
+def text_hash(text):
+    """Hash of an EN field value, or "" for values with nothing to translate."""
+    if not text or not isinstance(text, str):
+        return ""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def stale_sources():
+    """TranslationSource rows whose French is missing or older than the EN text."""
+    return TranslationSource.objects.exclude(current_hash="").exclude(source_hash=F("current_hash"))
+
+
+def _upsert_sources(rows, update_fields):
+    TranslationSource.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["model_label", "object_id", "field"],
+        update_fields=update_fields,
+    )
+
+
+def record_english(translation):
+    """Track a saved EN translation row; return True if any French is now stale."""
+    master = translation.master
+    label = master._meta.label_lower
+    _upsert_sources(
+        [
+            TranslationSource(
+                model_label=label,
+                object_id=master.pk,
+                field=field,
+                current_hash=text_hash(getattr(translation, field, None)),
+            )
+            for field in translation.get_translated_fields()
+        ],
+        update_fields=["current_hash"],
+    )
+    return stale_sources().filter(model_label=label, object_id=master.pk).exists()
+
+
+def record_french(translation):
+    """Mark the fields of a saved FR translation row as reflecting their EN text.
+
+    Rows written by the drain name the exact EN text each field was translated
+    from; rows saved by hand count as up to date with the current English.
+    """
+    master = translation.master
+    sources = getattr(translation, "_translated_from", None)
+    if sources is None:
+        try:
+            en_trans = master.get_translation("en")
+        except TranslationDoesNotExist:
+            return
+        sources = {
+            field: getattr(en_trans, field, None)
+            for field in translation.get_translated_fields()
+            if getattr(translation, field, None)
+        }
+    rows = []
+    for field, text in sources.items():
+        if source := text_hash(text):
+            rows.append(
+                TranslationSource(
+                    model_label=master._meta.label_lower,
+                    object_id=master.pk,
+                    field=field,
+                    current_hash=source,
+                    source_hash=source,
+                )
+            )
+    # current_hash is left alone: English saved since the translation started stays stale.
+    _upsert_sources(rows, update_fields=["source_hash"])
+
+
+def _french_sources(instance, recorded):
+    """Return ``{field: EN text}`` whose French is missing or out of date.
+
+    ``recorded`` maps field names to the EN hash their French was made from.
+    """
+    if not instance.has_translation("en"):
+        return {}
+    en_trans = instance.get_translation("en")
+    return {
+        field: value
+        for field in instance._parler_meta.get_translated_fields()
+        if (source := text_hash(value := getattr(en_trans, field, None)))
+        and recorded.get(field) != source
+    }
+
+
+def _write_french(instance, sources, translated):
+    sources = {field: text for field, text in sources.items() if text in translated}
+    if not sources:
+        return
+    instance.set_current_language("fr")
+    for field, text in sources.items():
+        setattr(instance, field, translated[text])
+    # Tells record_french which EN text these fields now reflect.
+    instance.get_translation("fr")._translated_from = sources
+    try:
+        # Writes only the FR row, which main.signals does not queue jobs for.
+        instance.save_translations()
+    finally:
+        instance.set_current_language("en")
+
+
+def memory_hash(text, source="en", target="fr"):
+    return hashlib.sha256(f"{source}\x00{target}\x00{text}".encode()).hexdigest()
+
+
+def memory_stats():
+    """Return ``{"hits": n, "misses": n}`` for translation memory lookups so far."""
+    with _memory_stats_lock:
+        return {"hits": _memory_stats["hits"], "misses": _memory_stats["misses"]}
+
+
+def lookup_memory(texts, source="en", target="fr"):
+    """Return ``{text: translation}`` for the texts the memory already knows."""
+    hashes = {memory_hash(text, source, target): text for text in texts}
+    entries = TranslationMemory.objects.filter(source_hash__in=hashes).values_list(
+        "pk", "source_hash", "translated_text"
+    )
+    found = {hashes[source_hash]: translated for _pk, source_hash, translated in entries}
+    if found:
+        TranslationMemory.objects.filter(pk__in=[pk for pk, _h, _t in entries]).update(
+            hits=F("hits") + 1, last_used_at=timezone.now()
+        )
+    with _memory_stats_lock:
+        _memory_stats["hits"] += len(found)
+        _memory_stats["misses"] += len(hashes) - len(found)
+    return found
+
+
+def remember(pairs, source="en", target="fr"):
+    """Store ``(text, translation)`` pairs; existing entries are left untouched."""
+    TranslationMemory.objects.bulk_create(
+        [
+            TranslationMemory(
+                source_hash=memory_hash(text, source, target),
+                source_language=source,
+                target_language=target,
+                source_text=text,
+                translated_text=translated,
+            )
+            for text, translated in pairs
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def _translate_sources(source_maps, backend=None):
+    """Translate every distinct EN string across ``source_maps`` exactly once.
+
+    The translation memory is consulted first; only unknown strings reach the
+    backend, and its answers are remembered for next time. Strings the backend
+    leaves untranslated are missing from the result.
+    """
+    texts = list(dict.fromkeys(text for sources in source_maps for text in sources.values()))
+    if not texts:
+        return {}
+    translated = lookup_memory(texts)
+    missing = [text for text in texts if text not in translated]
+    if missing:
+        backend = backend or get_backend()
+        replies = backend.translate_batch(missing)
+        fetched = [
+            (text, reply) for text, reply in zip(missing, replies, strict=True) if reply is not None
+        ]
+        remember(fetched)
+        translated.update(fetched)
+    return translated
+
+
+def enqueue_translation(instance):
+    """Queue ``instance`` for auto-translation (deduplicated per row)."""
+    model_label = instance._meta.label_lower
+    try:
+        with transaction.atomic():
+            job, created = TranslationJob.objects.get_or_create(
+                model_label=model_label, object_id=instance.pk
+            )
+    except IntegrityError:
+        # Lost a race with another save of the same row — that job covers us.
+        return
+    if not created and job.status != TranslationJob.STATUS_PENDING:
+        # Re-arm finished-with-errors or in-flight jobs; a RUNNING job that is
+        # flipped back to PENDING is kept by its worker and processed again.
+        TranslationJob.objects.filter(pk=job.pk).update(
+            status=TranslationJob.STATUS_PENDING, attempts=0, updated_at=timezone.now()
+        )
+    transaction.on_commit(_start_drain)
+
+
+def _start_drain():
+    """Hand the queue to the worker pool, never holding more drains than workers."""
+    workers = getattr(settings, "TRANSLATION_WORKERS", 1)
+    if workers <= 0:
+        return
+    _drain.start(workers)
+
+
+def resume_jobs():
+    """Drain jobs left queued by a previous worker; run when a gunicorn worker boots."""
+    _start_drain()
+
+
+def claim_next_job(exclude=()):
+    """Atomically move the oldest runnable job to RUNNING and return it, or None."""
+    stale = timezone.now() - JOB_LEASE
+    runnable = TranslationJob.objects.filter(
+        Q(status=TranslationJob.STATUS_PENDING)
+        | Q(status=TranslationJob.STATUS_RUNNING, updated_at__lt=stale)
+    ).exclude(pk__in=exclude)
+    for job in runnable.order_by("created_at")[:10]:
+        claimed = TranslationJob.objects.filter(pk=job.pk, status=job.status).update(
+            status=TranslationJob.STATUS_RUNNING,
+            attempts=F("attempts") + 1,
+            updated_at=timezone.now(),
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def _mark_failed(job, exc):
+    status = (
+        TranslationJob.STATUS_FAILED
+        if job.attempts >= MAX_ATTEMPTS
+        else TranslationJob.STATUS_PENDING
+    )
+    TranslationJob.objects.filter(pk=job.pk, status=TranslationJob.STATUS_RUNNING).update(
+        status=status, last_error=str(exc)[:1000], updated_at=timezone.now()
+    )
+
+
+def _mark_done(job):
+    # A save during the run re-armed the job as PENDING — leave it for another pass.
+    TranslationJob.objects.filter(pk=job.pk, status=TranslationJob.STATUS_RUNNING).delete()
+
+
+def run_jobs(jobs, backend=None):
+    """Translate a batch of claimed jobs together; returns ``(succeeded, failed)``.
+
+    Nothing is saved unless the batched translation requests succeed.
+    """
+    by_label = defaultdict(list)
+    for job in jobs:
+        by_label[job.model_label].append(job)
+
+    succeeded = failed = 0
+    work = []  # (job, instance, {field: EN text})
+    for label, label_jobs in by_label.items():
+        object_ids = [job.object_id for job in label_jobs]
+        instances = (
+            apps.get_model(label).objects.prefetch_related("translations").in_bulk(object_ids)
+        )
+        recorded = defaultdict(dict)
+        for object_id, field, source_hash in TranslationSource.objects.filter(
+            model_label=label, object_id__in=object_ids
+        ).values_list("object_id", "field", "source_hash"):
+            recorded[object_id][field] = source_hash
+        for job in label_jobs:
+            instance = instances.get(job.object_id)
+            if instance is None:
+                _mark_done(job)  # row deleted since it was queued
+                succeeded += 1
+                continue
+            try:
+                work.append((job, instance, _french_sources(instance, recorded[job.object_id])))
+            except Exception as exc:
+                logger.exception("Translation failed for %s", job)
+                _mark_failed(job, exc)
+                failed += 1
+
+    try:
+        translated = _translate_sources([sources for _job, _obj, sources in work], backend)
+    except Exception as exc:
+        logger.exception("Translation batch of %s jobs failed", len(work))
+        for job, _obj, _sources in work:
+            _mark_failed(job, exc)
+        return succeeded, failed + len(work)
+
+    # One page/fragment invalidation for the whole batch rather than one per row.
+    with coalesce_invalidations():
+        for job, instance, sources in work:
+            try:
+                if sources:
+                    _write_french(instance, sources, translated)
+            except Exception as exc:
+                logger.exception("Saving translation failed for %s", job)
+                _mark_failed(job, exc)
+                failed += 1
+            else:
+                _mark_done(job)
+                succeeded += 1
+    return succeeded, failed
+
+
+def process_jobs(limit=None, batch_size=None):
+    """Drain the queue in batches; returns ``(succeeded, failed)`` counts.
+
+    Each job is tried at most once per drain, so a failing job waits for the
+    next drain instead of burning through its attempts back to back.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    succeeded = failed = 0
+    seen = []
+    while limit is None or succeeded + failed < limit:
+        room = batch_size if limit is None else min(batch_size, limit - succeeded - failed)
+        jobs = []
+        while len(jobs) < room and (job := claim_next_job(exclude=seen)) is not None:
+            seen.append(job.pk)
+            jobs.append(job)
+        if not jobs:
+            break
+        ok, bad = run_jobs(jobs)
+        succeeded += ok
+        failed += bad
+    return succeeded, failed
+
+
+_drain = Drain("translate", process_jobs, lambda: next_wakeup(TranslationJob, JOB_LEASE))
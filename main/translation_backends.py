@@ -0,0 +1,169 @@
+"""Translator backends for the EN->FR auto-translation queue.
+
+A backend turns a list of EN strings into a list of FR strings of the same
+length, using None for any string it cannot translate. The active backend is
+named by the ``TRANSLATION_BACKEND`` setting (a dotted path) and built with
+``TRANSLATION_BACKEND_OPTIONS`` as keyword arguments on first use, so the
+translation stack is only imported by processes that actually translate.
+"""
+
+import logging
+import re
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "main.translation_backends.GoogleBackend"
+
+# Google's web endpoint rejects payloads of 5000+ characters; leave headroom.
+BATCH_CHAR_LIMIT = 4500
+
+# Joins texts into one request. Bracketed symbols survive translation intact;
+# the split tolerates whitespace the translator adds or drops around them.
+BATCH_SEPARATOR = "\n[[§]]\n"
+_SEPARATOR_RE = re.compile(r"\s*\[\[§\]\]\s*")
+
+# Network retries per request, with the delay doubling from RETRY_BACKOFF seconds.
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 1.0
+
+_backend = None
+
+
+class BaseBackend:
+    """Translate ``texts`` from ``source`` to ``target``; subclasses override translate_batch."""
+
+    def __init__(self, source="en", target="fr"):
+        self.source = source
+        self.target = target
+
+    def translate_batch(self, texts):
+        raise NotImplementedError
+
+
+def _with_retries(func, *args):
+    """Call ``func`` with exponential backoff between failed attempts."""
+    delay = RETRY_BACKOFF
+    for attempt in range(1, RETRY_ATTEMPTS + 1):
+        try:
+            return func(*args)
+        except Exception:
+            if attempt == RETRY_ATTEMPTS:
+                raise
+            logger.warning("Translation request failed (attempt %s), retrying", attempt)
+            time.sleep(delay)
+            delay *= 2
+
+
+def _chunk_texts(texts):
+    """Greedily pack texts into joined payloads no longer than BATCH_CHAR_LIMIT."""
+    chunk, size = [], 0
+    for text in texts:
+        extra = len(text) + (len(BATCH_SEPARATOR) if chunk else 0)
+        if chunk and size + extra > BATCH_CHAR_LIMIT:
+            yield chunk
+            chunk, size = [], 0
+            extra = len(text)
+        chunk.append(text)
+        size += extra
+    if chunk:
+        yield chunk
+
+
+def translate_texts(texts, translator):
+    """Translate ``texts`` in as few requests as possible, preserving order.
+
+    Texts are joined with BATCH_SEPARATOR into payloads under the per-request
+    size cap. If a reply does not split back into the same number of parts, the
+    separator was mangled and that chunk falls back to one request per text.
+    """
+    results = []
+    for chunk in _chunk_texts(texts):
+        if len(chunk) == 1:
+            results.append(_with_retries(translator.translate, chunk[0]))
+            continue
+        reply = _with_retries(translator.translate, BATCH_SEPARATOR.join(chunk))
+        parts = _SEPARATOR_RE.split(reply.strip())
+        if len(parts) != len(chunk):
+            logger.warning(
+                "Batch separator lost in translation; retrying %s texts singly", len(chunk)
+            )
+            parts = [_with_retries(translator.translate, text) for text in chunk]
+        results.extend(parts)
+    return results
+
+
+class GoogleBackend(BaseBackend):
+    """Google Translate's web endpoint via deep_translator, in joined batches."""
+
+    def __init__(self, translator=None, **kwargs):
+        super().__init__(**kwargs)
+        self.translator = translator
+
+    def translate_batch(self, texts):
+        translator = self.translator
+        if translator is None:
+            # GoogleTranslator keeps per-request state; pool threads each get their own.
+            from deep_translator import GoogleTranslator
+
+            translator = GoogleTranslator(source=self.source, target=self.target)
+        return translate_texts(texts, translator)
+
+
+class NoopBackend(BaseBackend):
+    """Translates nothing; jobs complete without writing French."""
+
+    def translate_batch(self, texts):
+        return [None] * len(texts)
+
+
+class DictionaryBackend(BaseBackend):
+    """Offline backend: answers from a fixed glossary only.
+
+    Strings already in the translation memory never reach a backend, so this
+    also serves as a memory-only mode when the glossary is empty.
+    """
+
+    def __init__(self, translations=None, **kwargs):
+        super().__init__(**kwargs)
+        self.translations = dict(translations or {})
+
+    def translate_batch(self, texts):
+        return [self.translations.get(text) for text in texts]
+
+
+class FakeBackend(BaseBackend):
+    """Prefixes each string and sleeps ``latency`` seconds per batch, for load tests."""
+
+    def __init__(self, latency=0.0, prefix="[fr] ", **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.prefix = prefix
+        self.calls = 0
+
+    def translate_batch(self, texts):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [f"{self.prefix}{text}" for text in texts]
+
+
+def get_backend():
+    """Return the configured backend, building it on first use."""
+    global _backend
+    if _backend is None:
+        backend_class = import_string(getattr(settings, "TRANSLATION_BACKEND", DEFAULT_BACKEND))
+        _backend = backend_class(**getattr(settings, "TRANSLATION_BACKEND_OPTIONS", {}))
+    return _backend
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    global _backend
+    if setting in ("TRANSLATION_BACKEND", "TRANSLATION_BACKEND_OPTIONS"):
+        _backend = None
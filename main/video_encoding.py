@@ -0,0 +1,93 @@
+"""ffmpeg work for hero video derivatives, kept free of Django imports.
+
+Like main.image_encoding, ``render_video_derivatives`` runs in main.images'
+process pool. It reads the original from a local path, since ffmpeg seeks in
+its input rather than taking it on stdin, and leaves its output in a local
+directory too, so whole renditions never travel back through the pool.
+"""
+
+import os
+import subprocess
+import tempfile
+
+from PIL import Image
+
+from .image_encoding import target_widths
+
+# Posters are shown until the video plays, so a lighter encode is fine.
+POSTER_QUALITY = {"webp": 75, "jpg": 80}
+POSTER_MAX_WIDTH = 1920
+
+# Seconds into the clip for the poster frame; very short clips use frame 0.
+POSTER_OFFSET = "1"
+
+
+def _run(args, timeout):
+    try:
+        subprocess.run(args, check=True, capture_output=True, timeout=timeout)
+    except subprocess.CalledProcessError as exc:
+        stderr = exc.stderr.decode(errors="replace").strip()
+        raise OSError(f"ffmpeg failed: {stderr[-500:]}") from exc
+    except subprocess.TimeoutExpired as exc:
+        raise OSError(f"ffmpeg timed out after {timeout}s") from exc
+
+
+def _extract_frame(path, ffmpeg, directory, timeout):
+    frame = os.path.join(directory, "frame.png")
+    for offset in (POSTER_OFFSET, "0"):
+        _run(
+            [ffmpeg, "-nostdin", "-v", "error", "-y", "-ss", offset, "-i", path]
+            + ["-map", "0:v:0", "-frames:v", "1", frame],
+            timeout,
+        )
+        if os.path.exists(frame):
+            image = Image.open(frame)
+            image.load()
+            return image.convert("RGB")
+    raise OSError("ffmpeg found no video frame")
+
+
+def _encode_poster(image, fmt, target):
+    if image.width > POSTER_MAX_WIDTH:
+        height = max(1, round(image.height * POSTER_MAX_WIDTH / image.width))
+        image = image.resize((POSTER_MAX_WIDTH, height), Image.Resampling.LANCZOS)
+    if fmt == "jpg":
+        image.save(target, "JPEG", quality=POSTER_QUALITY[fmt], optimize=True, progressive=True)
+    else:
+        image.save(target, fmt.upper(), quality=POSTER_QUALITY[fmt])
+
+
+def _transcode(path, ffmpeg, height, target, timeout):
+    # Muted, looping background: drop audio, and put the index up front so
+    # playback starts before the whole file has arrived.
+    _run(
+        [ffmpeg, "-nostdin", "-v", "error", "-y", "-i", path, "-map", "0:v:0"]
+        + ["-vf", f"scale=-2:{height}", "-c:v", "libx264", "-preset", "slow", "-crf", "26"]
+        + ["-pix_fmt", "yuv420p", "-movflags", "+faststart", "-an", target],
+        timeout,
+    )
+
+
+def render_video_derivatives(path, heights, ffmpeg, directory, skip=(), timeout=600):
+    """Extract a poster and transcode size-capped MP4 renditions of the video at ``path``.
+
+    Writes them into ``directory`` and returns ``{suffix: path}`` with
+    suffixes ``poster.webp``, ``poster.jpg`` and ``<height>p.mp4`` (heights
+    capped at the original's), leaving out the suffixes in ``skip``. Raises
+    OSError when ffmpeg cannot read the video.
+    """
+    found = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        frame = _extract_frame(path, ffmpeg, scratch, timeout)
+    for fmt in POSTER_QUALITY:
+        suffix = f"poster.{fmt}"
+        if suffix not in skip:
+            found[suffix] = os.path.join(directory, suffix)
+            _encode_poster(frame, fmt, found[suffix])
+    for height in target_widths(heights, frame.height):
+        height -= height % 2  # H.264 with 4:2:0 chroma needs even dimensions
+        suffix = f"{height}p.mp4"
+        if suffix not in skip:
+            found[suffix] = os.path.join(directory, suffix)
+            _transcode(path, ffmpeg, height, found[suffix], timeout)
+    return found
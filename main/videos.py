@@ -0,0 +1,122 @@
+"""Poster frames and size-capped renditions of the hero background video.
+
+An uploaded hero video is queued like an image (see main.images) and, if an
+ffmpeg binary is available, gets a poster (``<name>.poster.webp`` /
+``.poster.jpg``) and H.264 MP4 renditions (``<name>.<height>p.mp4``) stored
+next to it. The poster is what the hero paints first, so the largest
+contentful paint no longer waits for video bytes. Without ffmpeg the job is
+parked as FAILED with the reason, and the template keeps playing the
+original, just without a poster; ``build_derivatives --retry-failed`` picks
+the job up once ffmpeg is installed.
+"""
+
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Profile
+
+# Rendition heights per video field, ascending.
+VIDEO_RENDITIONS = {
+    (Profile, "hero_video_file"): (720, 1080),
+}
+
+POSTER_FORMATS = ("webp", "jpg")
+
+DERIVATIVES_CACHE_TIMEOUT = 24 * 3600
+
+_DERIVATIVE_RE = r"(poster|\d+p)(?:\.[0-9a-f]+)?\.(webp|jpg|mp4)"
+
+
+def ffmpeg_binary():
+    """Path of the ffmpeg executable, or None when there is none to use."""
+    return shutil.which(getattr(settings, "FFMPEG_BINARY", "") or "ffmpeg")
+
+
+def video_derivative_name(name, suffix):
+    return f"{name}.{suffix}"
+
+
+def _cache_key(name):
+    return f"video:derivatives:{hashlib.sha1(name.encode()).hexdigest()}"
+
+
+def scan_video_derivatives(name, storage, use_cache=True):
+    """``{suffix: name}`` for the poster and renditions of the video ``name``."""
+    key = _cache_key(name)
+    if use_cache and (found := cache.get(key)) is not None:
+        return found
+    pattern = re.compile(rf"^{re.escape(posixpath.basename(name))}\.{_DERIVATIVE_RE}$")
+    directory = posixpath.dirname(name)
+    try:
+        _dirs, files = storage.listdir(directory)
+    except FileNotFoundError:
+        files = []
+    found = {}
+    for filename in files:
+        if match := pattern.match(filename):
+            found[f"{match[1]}.{match[2]}"] = posixpath.join(directory, filename)
+    cache.set(key, found, DERIVATIVES_CACHE_TIMEOUT)
+    return found
+
+
+def forget_video_derivatives(name):
+    cache.delete(_cache_key(name))
+
+
+def video_sources(fieldfile):
+    """``{"poster": url, "sources": [(url, mime type, media query)]}`` for ``fieldfile``.
+
+    Renditions come smallest first, each but the last limited to viewports it
+    covers. The original always comes last, for browsers that cannot play the
+    renditions (and as the only source until they exist).
+    """
+    if not fieldfile:
+        return {"poster": "", "sources": []}
+    storage = fieldfile.storage
+    found = scan_video_derivatives(fieldfile.name, storage)
+    poster = next(
+        (storage.url(found[f"poster.{fmt}"]) for fmt in POSTER_FORMATS if f"poster.{fmt}" in found),
+        "",
+    )
+    heights = sorted(int(suffix[:-5]) for suffix in found if suffix.endswith("p.mp4"))
+    sources = [
+        (
+            storage.url(found[f"{height}p.mp4"]),
+            "video/mp4",
+            # A 16:9 rendition is sharp up to this many CSS pixels across.
+            "" if height == heights[-1] else f"(max-width: {height * 16 // 9}px)",
+        )
+        for height in heights
+    ]
+    mime, _encoding = mimetypes.guess_type(fieldfile.name)
+    sources.append((fieldfile.url, mime or "video/mp4", ""))
+    return {"poster": poster, "sources": sources}
+
+
+@contextmanager
+def local_path(storage, name):
+    """A filesystem path to the stored file ``name``, copied to a temp file if need be."""
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        path = None
+    if path is not None:
+        yield path
+        return
+    handle, path = tempfile.mkstemp(suffix=posixpath.splitext(name)[1])
+    try:
+        with os.fdopen(handle, "wb") as target, storage.open(name) as source:
+            for chunk in source.chunks():
+                target.write(chunk)
+        yield path
+    finally:
+        os.unlink(path)
@@ -3,26 +3,37 @@ import logging
 from django.contrib import messages
 from django.shortcuts import redirect, render
 from django.utils.translation import gettext as _
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django_ratelimit.decorators import ratelimit
 
-from .forms import ContactForm, TestimonialForm
-from .models import (
-    ContactInfo,
-    Education,
-    Experience,
-    Hobby,
-    Profile,
-    Project,
-    Recognition,
-    Skill,
-    Testimonial,
+from .caching import (
+    CSRF_TOKEN_PLACEHOLDER,
+    cache_page_response,
+    cached_page_response,
+    home_etag,
+    home_last_modified,
+    page_cache_key,
 )
+from .forms import ContactForm, TestimonialForm
+from .models import ContactInfo, Profile
+from .snapshot import snapshot_content
 
 logger = logging.getLogger(__name__)
 
 
 @ratelimit(key="ip", rate="5/h", method="POST", block=False)
+# private: every copy carries its holder's CSRF token. no-cache: always revalidate,
+# which the ETag/Last-Modified below turn into a cheap 304.
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=home_etag, last_modified_func=home_last_modified)
 def home(request):
+    page_key = page_cache_key(request)
+    if page_key:
+        response = cached_page_response(request, page_key)
+        if response is not None:
+            return response
+
     contact_form = ContactForm(prefix="contact")
     testimonial_form = TestimonialForm(prefix="testimonial")
 
@@ -82,20 +93,12 @@ def home(request):
     context = {
         "profile": Profile.load(),
         "contact_info": ContactInfo.load(),
-        "skills": Skill.objects.prefetch_related("translations"),
-        "projects": Project.objects.prefetch_related("translations", "tech_tags").order_by(
-            "-created_date"
-        ),
-        "experiences": Experience.objects.prefetch_related("translations", "tech_used").order_by(
-            "-start_date"
-        ),
-        "educations": Education.objects.prefetch_related("translations").order_by("-start_date"),
-        "recognitions": Recognition.objects.prefetch_related("translations").order_by("order"),
-        "hobbies": Hobby.objects.prefetch_related("translations"),
-        "testimonials": Testimonial.objects.filter(is_approved=True)
-        .prefetch_related("translations")
-        .order_by("-created_at"),
+        **snapshot_content(),
         "contact_form": contact_form,
         "testimonial_form": testimonial_form,
     }
+    if page_key:
+        context["csrf_token"] = CSRF_TOKEN_PLACEHOLDER
+        response = render(request, "main/home.html", context)
+        return cache_page_response(request, page_key, response)
     return render(request, "main/home.html", context)
@@ -123,8 +123,8 @@ TEMPLATES = [
 WSGI_APPLICATION = "portfolio_core.wsgi.application"
 
 
-# Cache (for rate limiting; requires atomic increments - Redis/Memcached, NOT DatabaseCache)
-# django-ratelimit needs atomic operations; DatabaseCache causes race conditions.
+# Cache. Rate limiting needs atomic increments shared by all workers: Redis,
+# or the SQLite-backed "ratelimit" cache below — not DatabaseCache/LocMemCache.
 _REDIS_URL = os.environ.get("REDIS_URL")
 if _REDIS_URL:
     CACHES = {
@@ -134,26 +134,33 @@ if _REDIS_URL:
         }
     }
 else:
-    # Fallback: LocMemCache. Per-process, no atomic cross-worker increments.
-    # In prod with multiple gunicorn workers this means rate-limit counters
-    # are per-worker (client effectively gets N * limit). Acceptable for a
-    # low-traffic portfolio; set REDIS_URL to fix.
-    if not DEBUG:
-        import warnings
-
-        warnings.warn(
-            "REDIS_URL not set — using LocMemCache in production. "
-            "Rate limiting is per-worker and not atomic. "
-            "Set REDIS_URL to enable shared cache.",
-            RuntimeWarning,
-            stacklevel=2,
-        )
+    # Fallback: LocMemCache, per process. Page and fragment caches are then
+    # per gunicorn worker, and edits reach the other workers' fragments only
+    # when they expire (manage.py check --deploy warns: main.W001); rate limits
+    # stay shared through the "ratelimit" cache below.
     CACHES = {
         "default": {
             "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         }
     }
 
+# django-ratelimit counts in RATELIMIT_USE_CACHE. Without Redis that is a
+# SQLite file every worker on the host shares, with atomic add/incr
+# (main.cache_backends.SQLiteCache). The test runner swaps in a private
+# in-memory database (portfolio_core/test_runner.py).
+RATELIMIT_CACHE_LOCATION = os.environ.get(
+    "RATELIMIT_CACHE_LOCATION", str(BASE_DIR / "ratelimit.sqlite3")
+)
+CACHES["ratelimit"] = {
+    "BACKEND": "main.cache_backends.SQLiteCache",
+    "LOCATION": RATELIMIT_CACHE_LOCATION,
+}
+RATELIMIT_USE_CACHE = os.environ.get(
+    "RATELIMIT_USE_CACHE", "default" if _REDIS_URL else "ratelimit"
+)
+
+TEST_RUNNER = "portfolio_core.test_runner.TestRunner"
+
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
@@ -209,6 +216,34 @@ PARLER_LANGUAGES = {
     },
 }
 
+# Re-render the home page in the background after content changes and when a
+# gunicorn worker boots (see gunicorn.conf.py), so visitors never pay for a
+# cold cache. `python manage.py warm_cache` does the same on demand.
+HOME_CACHE_WARMUP = os.environ.get("HOME_CACHE_WARMUP", "False") == "True"
+
+# Auto-translation job queue (main.translation). Threads per process that drain
+# queued EN->FR jobs after each save; set to 0 to leave the queue entirely to
+# `python manage.py translate_worker`.
+TRANSLATION_WORKERS = int(os.environ.get("TRANSLATION_WORKERS", 1))
+
+# Translator used for strings not yet in the translation memory; see
+# main.translation_backends for the offline NoopBackend, DictionaryBackend and
+# FakeBackend. Options are passed to the backend as keyword arguments.
+TRANSLATION_BACKEND = os.environ.get(
+    "TRANSLATION_BACKEND", "main.translation_backends.GoogleBackend"
+)
+TRANSLATION_BACKEND_OPTIONS = {}
+
+# Image derivative queue (main.images). Encoder processes per web process, used
+# by one drain thread after each upload; set to 0 to leave the queue entirely
+# to `python manage.py build_derivatives`.
+IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", 1))
+
+# Hero video posters and renditions (main.videos) need ffmpeg; without it the
+# original video is served as uploaded. Per-invocation timeout in seconds.
+FFMPEG_BINARY = os.environ.get("FFMPEG_BINARY", "ffmpeg")
+FFMPEG_TIMEOUT = int(os.environ.get("FFMPEG_TIMEOUT", 600))
+
 LOCALE_PATHS = [
     BASE_DIR / "locale",
 ]
@@ -227,8 +262,9 @@ STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
 STORAGES = {
+    # Uploads are stored under content-hash names, so they can be cached forever.
     "default": {
-        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "BACKEND": "main.storage.HashedFileSystemStorage",
     },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
@@ -238,6 +274,19 @@ STORAGES = {
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Gzipped JSONL archives of old contact messages (manage.py archive_messages).
+# Not served: keep it outside MEDIA_ROOT.
+ARCHIVE_ROOT = Path(os.environ.get("ARCHIVE_ROOT", BASE_DIR / "archive"))
+
+# Media responses (main.media). Content-hashed names (every upload stored by
+# main.storage) are cached for a year; anything else, e.g. files uploaded
+# before hashing, for MEDIA_CACHE_MAX_AGE seconds. Behind nginx, set
+# MEDIA_SENDFILE to "x-accel-redirect" and map an internal location at the
+# prefix onto MEDIA_ROOT; behind Apache/lighttpd, use "x-sendfile".
+MEDIA_CACHE_MAX_AGE = int(os.environ.get("MEDIA_CACHE_MAX_AGE", 86400))
+MEDIA_SENDFILE = os.environ.get("MEDIA_SENDFILE", "")
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get("MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+
 
 LOGGING = {
     "version": 1,
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """DiscoverRunner with test-only settings.
+
+    The "ratelimit" cache moves to a private in-memory SQLite database, so
+    counts never carry over between runs or into the development server's.
+    Translation and image jobs are still queued, but no background drain is
+    started: its threads would race the tests for SQLite ("database is
+    locked"). Tests drain the queues explicitly.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        caches = {**settings.CACHES}
+        caches["ratelimit"] = {**caches["ratelimit"], "LOCATION": ":memory:"}
+        self._test_settings = override_settings(
+            CACHES=caches, TRANSLATION_WORKERS=0, IMAGE_WORKERS=0
+        )
+        self._test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)